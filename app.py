@@ -2,82 +2,705 @@ import streamlit as st
 import pandas as pd
 import os
 import uuid
+import functools
 import hashlib
 from datetime import datetime
-from io import BytesIO
-from streamlit_gsheets import GSheetsConnection
+from storage import STORAGE_ERRORS, GSheetsBackend, SQLiteBackend, ConflictError, StorageUnavailable, migrate
+from scheduler import Scheduler
+from cache import SheetCache
+from logs import LOG_FIELDS, LogWriter, LogIndex, filter_logs
+from compaction import SNAPSHOT_KEEP, FileArchive, SheetArchive, SnapshotScheduler, compact, inventory_at
+from backup import BackupManager, FORMATS, CHUNK_SIZE, available_formats, frame_chunks, frame_key
+from schema import STATUSES, normalize, to_storage, to_editable
+from inventory import Inventory, diff_frames
+from search import SearchIndex, paginate
+from instrumentation import METRICS, InstrumentedBackend
 
-# 1. 페이지 기본 설정 및 구글 시트 연결
+# 1. 페이지 기본 설정 및 저장소 연결
 st.set_page_config(page_title="통합 장비 관리 시스템", layout="wide", page_icon="🛠️")
-conn = st.connection("gsheets", type=GSheetsConnection)
 
-# 장비 데이터 필드 정의
-FIELD_NAMES = ['ID', '타입', '이름', '수량', '브랜드', '특이사항', '대여업체', '대여여부', '대여자', '대여일', '반납예정일', '출고비고', '사진', '삭제요청']
+# R2D2_METRICS=1 이면 저장소 호출 수/바이트/시간을 측정하고 관리자 사이드바에 표시
+METRICS_ENABLED = os.environ.get("R2D2_METRICS", "").lower() in ("1", "true", "yes")
+
+# 저장소 선택: STORAGE_BACKEND=sqlite 이면 로컬 DB(SQLITE_PATH), fake 이면 메모리 시트(벤치마크용), 기본값은 구글 시트
+@st.cache_resource
+def get_backend():
+    kind = os.environ.get("STORAGE_BACKEND", "gsheets").lower()
+    if kind == "sqlite":
+        backend = SQLiteBackend(os.environ.get("SQLITE_PATH", "r2d2.db"))
+    elif kind == "fake":
+        # FAKE_ROWS/FAKE_LOG_ROWS 크기의 시트, 호출마다 FAKE_LATENCY초 지연
+        from fakes import FakeGSheetsConnection, make_sheets
+        sheets = make_sheets(int(os.environ.get("FAKE_ROWS", "1000")), int(os.environ.get("FAKE_LOG_ROWS", "1000")))
+        conn = FakeGSheetsConnection(sheets, latency=float(os.environ.get("FAKE_LATENCY", "0")))
+        backend = GSheetsBackend(conn, getattr(conn, "spreadsheet", None), get_scheduler())
+    else:
+        backend = _gsheets_backend()
+    return InstrumentedBackend(backend, METRICS) if METRICS_ENABLED else backend
+
+def _gsheets_backend():
+    from streamlit_gsheets import GSheetsConnection
+    return GSheetsBackend(st.connection("gsheets", type=GSheetsConnection), _open_spreadsheet(), get_scheduler())
+
+# 서비스 계정 설정이면 gspread로 스프레드시트를 직접 열어 행 단위 API에 사용 (공개 시트 연결이면 None)
+def _open_spreadsheet():
+    try:
+        cfg = dict(st.secrets["connections"]["gsheets"])
+    except (KeyError, FileNotFoundError):
+        return None
+    if cfg.get("type") != "service_account" or not cfg.get("spreadsheet"):
+        return None
+    import gspread
+    sheet = str(cfg.pop("spreadsheet"))
+    cfg.pop("worksheet", None)
+    client = gspread.service_account_from_dict(cfg)
+    opener = client.open_by_url if sheet.startswith("http") else client.open_by_key
+    return get_scheduler().call(opener, sheet)
+
+# 구글 시트 API 호출 스케줄러: 분당 SHEETS_QUOTA_PER_MIN회로 제한하고 429/일시 오류는 백오프 후 재시도
+@st.cache_resource
+def get_scheduler():
+    return Scheduler(rate_per_min=float(os.environ.get("SHEETS_QUOTA_PER_MIN", "60")),
+                     burst=int(os.environ.get("SHEETS_BURST", "10")))
+
+# 모든 세션이 공유하는 시트 캐시 (리비전이 없는 구글 시트는 CACHE_TTL초 동안 재사용)
+@st.cache_resource
+def get_sheet_cache():
+    return SheetCache(ttl=float(os.environ.get("CACHE_TTL", "30")))
+
+# 활동 로그는 로컬 스풀(LOG_SPOOL_PATH)에 먼저 기록한 뒤 묶어서 추가 전송
+@st.cache_resource
+def get_log_writer():
+    cache = get_sheet_cache()
+    return LogWriter(get_backend(), os.environ.get("LOG_SPOOL_PATH", "logs_spool.jsonl"),
+                     batch_size=500, on_flush=lambda: cache.invalidate("Logs"))
+
+# 백업 파일은 BACKUP_DIR에 디스크로 기록 (증분 백업 워터마크도 함께 보관)
+@st.cache_resource
+def get_backup_manager():
+    return BackupManager(os.environ.get("BACKUP_DIR", "backups"))
+
+# 보관 로그/스냅샷 저장 위치: ARCHIVE_DIR이 있으면 로컬 파일, 없으면 같은 저장소의 시트
+# (같은 스프레드시트에 보관할 때는 스냅샷을 SNAPSHOT_KEEP개만 남겨 셀 한도를 넘지 않도록 함)
+@st.cache_resource
+def get_archive():
+    path = os.environ.get("ARCHIVE_DIR")
+    return FileArchive(path) if path else SheetArchive(get_backend())
+
+def _snapshot_keep():
+    return int(os.environ.get("SNAPSHOT_KEEP", str(SNAPSHOT_KEEP)))
+
+# 재고 스냅샷을 SNAPSHOT_INTERVAL_HOURS시간(기본 24)마다 자동으로 남김 (0이면 사용 안 함)
+@st.cache_resource
+def get_snapshot_scheduler():
+    hours = float(os.environ.get("SNAPSHOT_INTERVAL_HOURS", "24"))
+    if hours <= 0:
+        return None
+    return SnapshotScheduler(get_backend(), get_archive(), hours, keep=_snapshot_keep())
 
 # 2. 데이터 처리 함수 (데이터 타입 및 공백 보정 강화)
-def load_data(sheet_name="Sheet1"):
+def _read_sheet(sheet_name):
+    # [핵심] 시트별 선언 타입으로 정규화 (공백 제거, 범주형/정수/날짜 변환, 승인 여부 대문자화)
+    return normalize(get_backend().read(sheet_name), sheet_name)
+
+# 저장소 장애 시 빈 표 대신 마지막으로 읽은 데이터를 경고와 함께 사용하고, 그것도 없으면 오류 표시 후 중단
+def _cached_sheet(key, loader, sheet_name):
+    cache = get_sheet_cache()
     try:
-        df = conn.read(worksheet=sheet_name, ttl=0)
-        df = df.fillna("")
-        
-        # [핵심] 모든 문자열의 공백을 제거하여 필터링 오류 방지
-        df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
-        
-        if sheet_name == "Sheet1":
-            if not df.empty:
-                # 삭제요청 열이 없으면 생성
-                if '삭제요청' not in df.columns:
-                    df['삭제요청'] = ""
-                # 수량을 정수형으로 강제 변환
-                df['수량'] = pd.to_numeric(df['수량'], errors='coerce').fillna(0).astype(int)
-            else:
-                df = pd.DataFrame(columns=FIELD_NAMES)
-        
-        # [핵심] 회원 데이터의 승인 여부 타입 일치화 (0, FALSE, False 모두 대응)
-        if sheet_name == "Users":
-            if not df.empty and 'approved' in df.columns:
-                df['approved'] = df['approved'].astype(str).str.upper()
-                
-        return df
-    except Exception as e:
-        return pd.DataFrame()
+        return cache.get(key, loader, get_backend().version(sheet_name))
+    except STORAGE_ERRORS as e:
+        stale = cache.peek(key)
+        if stale is None:
+            _storage_error(e)
+        st.warning("⚠️ 저장소 응답이 원활하지 않아 마지막으로 불러온 데이터를 표시합니다.")
+        return stale
+
+def _storage_error(e):
+    st.error(f"⚠️ 저장소에서 데이터를 불러오지 못했습니다. 잠시 후 다시 시도해 주세요. ({e})")
+    st.button("🔄 다시 시도", key="storage_retry")
+    st.stop()
+
+def load_data(sheet_name="Sheet1"):
+    # [핵심] 리비전이 같으면 공유 캐시를 사용하고, 세션별 수정에 대비해 사본을 반환
+    return _cached_sheet(sheet_name, lambda: _read_sheet(sheet_name), sheet_name).copy()
 
 def save_data(df, sheet_name="Sheet1"):
-    # 저장 전 수량 정수화 확인
-    if sheet_name == "Sheet1" and '수량' in df.columns:
-        df['수량'] = pd.to_numeric(df['수량'], errors='coerce').fillna(0).astype(int)
-    conn.update(worksheet=sheet_name, data=df)
-    st.cache_data.clear()
+    # 저장 전 수량 정수화 및 날짜 문자열 변환
+    get_backend().write(sheet_name, to_storage(df, sheet_name))
+    get_sheet_cache().invalidate(sheet_name)
+
+# 행 단위 추가/저장/삭제 (전체 시트를 다시 쓰지 않음)
+def append_rows(rows, sheet_name):
+    get_backend().append(sheet_name, to_storage(rows, sheet_name))
+    get_sheet_cache().invalidate(sheet_name)
+
+def save_rows(rows, sheet_name, key):
+    get_backend().upsert(sheet_name, to_storage(rows, sheet_name), key)
+    get_sheet_cache().invalidate(sheet_name)
+
+def delete_rows(ids, sheet_name, key):
+    get_backend().delete(sheet_name, ids, key)
+    get_sheet_cache().invalidate(sheet_name)
+
+# prev_status: 반납/상태변경/삭제 전의 대여여부 (시점 재고 복원 시 로그 재생에 사용)
+def _log_row(kind, item_name, qty, target, date_val, return_val='', prev_status=''):
+    return {
+        '시간': datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 
+        '작성자': st.session_state.get('username', 'system'),
+        '종류': kind, '장비이름': item_name, '수량': int(qty), 
+        '대상': target, '날짜': date_val, '반납예정일': return_val, '이전상태': prev_status
+    }
+
+def log_transaction(kind, item_name, qty, target, date_val, return_val='', prev_status=''):
+    get_log_writer().submit([_log_row(kind, item_name, qty, target, date_val, return_val, prev_status)])
+
+# 활동 로그 한 페이지 조회 (최신순). SQLite는 DB에서 바로, 구글 시트는 캐시된 시간순 인덱스로 조회
+def get_log_index():
+    return _cached_sheet("Logs:index", lambda: LogIndex(load_data("Logs")), "Logs")
 
-def log_transaction(kind, item_name, qty, target, date_val, return_val=''):
+def query_logs(offset=0, limit=50, **filters):
+    backend = get_backend()
+    # 전송 대기 중인 로그는 항상 가장 최신이므로 앞쪽에 먼저 배치
+    pending = get_log_writer().pending()
+    pending_df = filter_logs(pd.DataFrame(pending), **filters).iloc[::-1] if pending else pd.DataFrame()
+    head = pending_df.iloc[offset:offset + limit]
+    stored_offset = max(offset - len(pending_df), 0)
+    stored_limit = limit - len(head)
+    if hasattr(backend, "query_logs") and filters.get("item"):
+        # 장비이름 검색어는 입력할 때마다 달라지므로 캐시 키로 쓰지 않고 페이지와 함께 바로 셈
+        page, total = backend.query_logs(offset=stored_offset, limit=stored_limit, **filters)
+        page = page.fillna("")
+    elif hasattr(backend, "query_logs"):
+        # 전체 건수는 로그 리비전과 조건별로 캐시 (페이지를 넘길 때마다 전체를 세지 않음)
+        # 종류/작성자/기간 조합만 키가 되므로 캐시 항목 수가 화면의 선택지 범위로 제한됨
+        total = _cached_sheet(f"Logs:count:{_filter_key(filters)}", lambda: backend.count_logs(**filters), "Logs")
+        page, _ = backend.query_logs(offset=stored_offset, limit=stored_limit, count=False, **filters)
+        page = page.fillna("")
+    else:
+        page, total = get_log_index().query(offset=stored_offset, limit=stored_limit, **filters)
+    if not head.empty:
+        page = pd.concat([head, page], ignore_index=True)
+    return page.reset_index(drop=True), total + len(pending_df)
+
+def _filter_key(filters):
+    return repr(sorted((k, tuple(map(str, v)) if isinstance(v, (list, tuple)) else str(v)) for k, v in filters.items()))
+
+def log_filter_options(col):
+    backend = get_backend()
+    if hasattr(backend, "distinct"):
+        return _cached_sheet(f"Logs:distinct:{col}", lambda: backend.distinct("Logs", col), "Logs")
+    return get_log_index().values(col)
+
+# 재고 인덱스: 공유 캐시의 스냅샷이 바뀔 때만 새로 만들고, 작업 중에는 바뀐 행만 갱신
+def get_inventory():
+    version = get_backend().version("Sheet1")
+    snapshot = _cached_sheet("Sheet1", lambda: _read_sheet("Sheet1"), "Sheet1")
+    inv = st.session_state.get('inv')
+    if inv is None or inv.source is not snapshot:
+        inv = Inventory(snapshot.copy(), source=snapshot)
+        inv.version = version
+        st.session_state.inv = inv
+    return inv
+
+# 저장된 값과 세션의 원래 값을 같은 형식으로 맞춰 비교 (충돌 검사용)
+def _canon_sheet1(df):
+    return to_storage(normalize(df, "Sheet1"), "Sheet1").astype(str)
+
+# 충돌 시 세션의 변경분을 버리고 최신 데이터를 다시 불러오도록 한 뒤 실행 중단
+def _handle_conflict(e):
+    get_sheet_cache().invalidate("Sheet1")
+    st.session_state.pop('inv', None)
+    st.error(f"다른 사용자가 먼저 변경한 장비가 있어 저장하지 않았습니다 ({len(e.ids)}건). 최신 데이터로 다시 시도해 주세요.")
+    st.stop()
+
+# 재시도 후에도 저장소가 응답하지 않으면 세션의 변경분을 버리고 실행 중단 (저장된 것처럼 보이지 않도록)
+def _handle_unavailable(e):
+    st.session_state.pop('inv', None)
+    st.error(f"⚠️ 저장소가 응답하지 않아 저장하지 못했습니다. 잠시 후 다시 시도해 주세요. ({e})")
+    st.stop()
+
+def save_inventory(inv):
+    delta = inv.changes()
     try:
-        log_df = load_data("Logs")
-        new_log = {
-            '시간': datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 
-            '작성자': st.session_state.get('username', 'system'),
-            '종류': kind, '장비이름': item_name, '수량': int(qty), 
-            '대상': target, '날짜': date_val, '반납예정일': return_val
-        }
-        log_df = pd.concat([log_df, pd.DataFrame([new_log])], ignore_index=True)
-        save_data(log_df, "Logs")
-    except: pass
-
-def to_excel(df_list, sheet_names):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        for df, name in zip(df_list, sheet_names):
-            df.to_excel(writer, index=False, sheet_name=name)
-    return output.getvalue()
+        if delta is None:
+            # ID가 없는 행 등 행 단위 저장이 불가능하면 전체 저장
+            version = get_backend().write("Sheet1", to_storage(inv.df, "Sheet1"))
+        else:
+            version = get_backend().apply_delta("Sheet1", delta, "ID", canon=_canon_sheet1)
+    except ConflictError as e:
+        _handle_conflict(e)
+    except StorageUnavailable as e:
+        _handle_unavailable(e)
+    except Exception:
+        # 그 밖의 저장 오류(요청 거부, DB 오류 등)도 저장되지 않은 변경이 화면에 남지 않도록 버림
+        st.session_state.pop('inv', None)
+        raise
+    if version is None or inv.version is None or version != inv.version + 1:
+        # 리비전이 없는 저장소(구글 시트)이거나 그 사이 다른 세션의 저장이 있었으면
+        # 이 세션의 화면을 공유 캐시로 쓰지 않고 버린 뒤 다음 실행에서 최신 데이터로 재구성
+        get_sheet_cache().invalidate("Sheet1")
+        inv.commit(None)
+    else:
+        # 방금 저장한 상태를 공유 캐시에 그대로 반영해 다음 실행에서 인덱스를 다시 만들지 않음
+        inv.commit(get_sheet_cache().put("Sheet1", inv.df.copy(), version))
+    inv.version = version
+
+# 편집기(현재 페이지)에서 바뀐 행/셀만 저장
+def save_edits(inv, edited_df):
+    delta = diff_frames(inv.df.loc[edited_df.index], edited_df)
+    try:
+        if delta is None:
+            # 행 단위 저장이 불가능하면 편집한 페이지를 전체 재고에 합쳐서 저장
+            full = to_storage(inv.df, "Sheet1")
+            full.loc[edited_df.index, edited_df.columns] = to_storage(edited_df, "Sheet1")
+            save_data(full, "Sheet1")
+        elif not delta.empty:
+            get_backend().apply_delta("Sheet1", delta, "ID", canon=_canon_sheet1)
+    except ConflictError as e:
+        _handle_conflict(e)
+    except StorageUnavailable as e:
+        _handle_unavailable(e)
+    get_sheet_cache().invalidate("Sheet1")
+
+# 검색 인덱스 (세션의 재고 인덱스가 새로 만들어지면 함께 새로 생성)
+def get_search_index(inv):
+    idx = st.session_state.get('search_index')
+    if idx is None or idx.owner is not inv:
+        idx = SearchIndex(inv.df)
+        idx.owner = inv
+        st.session_state.search_index = idx
+    return idx
+
+SEARCH_LABEL = "🔍 검색 (이름/타입/브랜드/특이사항, 초성 가능)"
+SELECT_PAGE_SIZE = 50
+
+# 선택 목록용 검색: 검색어에 맞는 행을 순위대로 SELECT_PAGE_SIZE건씩 나눠 현재 페이지만 선택지로 보냄
+def search_rows(inv, rows, key):
+    q1, q2 = st.columns([3, 1])
+    query = q1.text_input(SEARCH_LABEL, key=key)
+    labels = get_search_index(inv).search(inv.df, query, within=rows.index)
+    page_no = 1
+    if len(labels) > SELECT_PAGE_SIZE:
+        page_no = q2.number_input("선택 목록 페이지", min_value=1, value=1, step=1, key=f"{key}_page")
+    page_labels, last_page = paginate(labels, page_no, SELECT_PAGE_SIZE)
+    if not labels:
+        st.info("검색 결과가 없습니다.")
+    elif last_page > 1:
+        st.caption(f"검색 결과 {len(labels)}건 · {min(int(page_no), last_page)}/{last_page} 페이지")
+    return rows.loc[list(page_labels)]
+
+# 장바구니: 여러 건의 대여/출고/반납을 모아 한 번에 처리
+def add_to_cart(kind, item, qty, target, return_date=''):
+    st.session_state.setdefault('cart', []).append({
+        'kind': kind, 'id': str(item['ID']), 'name': str(item['이름']), 'qty': int(qty),
+        'target': target, 'return_date': return_date
+    })
+
+# 재고 변경은 한 번의 변경분 저장, 로그는 한 번의 추가 전송으로 반영
+# 적용 도중이나 저장 중 오류가 나면 세션의 재고 인덱스를 버려 저장소 기준으로 다시 만듦
+def commit_cart(inv):
+    today = datetime.now().strftime("%Y-%m-%d")
+    try:
+        done = inv.apply_cart(st.session_state.get('cart', []), today)
+        save_inventory(inv)
+    except Exception:
+        st.session_state.pop('inv', None)
+        raise
+    rows = []
+    for e, item in done:
+        if e['kind'] == '반납':
+            rows.append(_log_row("반납", item['이름'], item['수량'], item['대여자'], today, prev_status=str(item['대여여부'])))
+        else:
+            rows.append(_log_row(e['kind'], item['이름'], e['qty'], e['target'], today, e['return_date']))
+    get_log_writer().submit(rows)
+    get_log_writer().flush(timeout=0)
+    st.session_state.cart = []
+    return len(done)
+
+# 백업 파일 생성: 재고 전체 + 활동 로그(전체 또는 마지막 백업 이후 추가분)
+# 조각 단위로 파일에 바로 기록하므로 데이터가 커져도 메모리 사용량이 일정함
+def export_backup(inv, fmt, incremental=False):
+    backend = get_backend()
+    # 전송 대기 중인 로그까지 포함되도록 먼저 저장소로 보냄
+    get_log_writer().flush(timeout=10)
+    if hasattr(backend, "iter_rows"):
+        log_chunks = lambda cursor: backend.iter_rows("Logs", CHUNK_SIZE, cursor)
+        logs_key = backend.version("Logs")
+    else:
+        logs_df = to_storage(load_data("Logs"), "Logs")
+        log_chunks = lambda cursor: frame_chunks(logs_df, CHUNK_SIZE, cursor)
+        logs_key = (len(logs_df), str(logs_df['시간'].iloc[-1]) if len(logs_df) else "")
+    inventory = to_storage(inv.df, "Sheet1")
+    key = (frame_key(inventory), logs_key)
+    return get_backup_manager().export(
+        fmt, inventory, LOG_FIELDS, log_chunks, key,
+        incremental=incremental, stamp=datetime.now().strftime('%Y%m%d_%H%M%S'),
+    )
+
+# 로그 보관: 지난 달 로그를 월별 파티션으로 옮기고 최근 hot_days일만 로그 시트에 남김
+def run_compaction(hot_days):
+    backend = get_backend()
+    get_log_writer().flush(timeout=10)
+    result = compact(backend, get_archive(), hot_days, keep_snapshots=_snapshot_keep())
+    if result['removed'] and not hasattr(backend, "iter_rows"):
+        # 행 위치 기준 백업 워터마크는 삭제된 앞쪽 행 수만큼 당김
+        get_backup_manager().rebase(result['removed'])
+    get_sheet_cache().invalidate("Logs")
+    return result
+
+# 구글 시트의 재고/회원/로그를 현재 저장소(SQLite)로 복사
+def run_migration(overwrite=False):
+    get_log_writer().flush(timeout=10)
+    copied = migrate(_gsheets_backend(), get_backend(), overwrite=overwrite)
+    for name in copied:
+        get_sheet_cache().invalidate(name)
+    st.session_state.pop('inv', None)
+    return copied
+
+# 지정 시점의 재고 (가장 가까운 스냅샷 또는 현재 재고에서 로그 재생)
+def load_inventory_at(ts):
+    get_log_writer().flush(timeout=10)
+    current = (datetime.now(), to_storage(get_inventory().df, "Sheet1"))
+    return inventory_at(get_backend(), get_archive(), ts, current=current)
 
 # 3. 메인 앱 실행 함수
+
+# 실행 단위 성능 측정: 전체 실행 중이면 그 실행에 합산하고,
+# 탭(fragment)만 다시 실행될 때는 그 탭 실행을 따로 기록
+def measured(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not METRICS_ENABLED or METRICS.current() is not None:
+            return fn(*args, **kwargs)
+        METRICS.start(f"{st.session_state.get('username', '')}:{fn.__name__}")
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            st.session_state.last_run_metrics = METRICS.stop()
+    return wrapper
+
+# 탭별 화면: 각 탭은 독립된 fragment라서 탭 안의 위젯을 조작하면 해당 탭만 다시 실행됨
+# (저장 후 st.rerun()은 상단 지표/장바구니까지 갱신하도록 전체 실행)
+# --- 탭 1: 재고 관리 ---
+@st.fragment
+@measured
+def tab_inventory():
+    inv = get_inventory()
+    with st.expander("➕ 새 장비 등록"):
+        with st.form("add_form", clear_on_submit=True):
+            col1, col2, col3 = st.columns([1,2,1])
+            t_input = col1.text_input("타입")
+            n_input = col2.text_input("장비명")
+            q_input = col3.number_input("수량", 1, step=1)
+            b_input = st.text_input("브랜드")
+            if st.form_submit_button("등록"):
+                new_item = {
+                    'ID': str(uuid.uuid4()), '타입': t_input, '이름': n_input, 
+                    '수량': int(q_input), '브랜드': b_input, '대여여부': '재고', '삭제요청': ''
+                }
+                inv.add(new_item)
+                save_inventory(inv)
+                log_transaction("등록", n_input, q_input, '', datetime.now().strftime("%Y-%m-%d"))
+                st.success("등록 완료")
+                st.rerun()
+
+    # 검색/패싯 필터 후 현재 페이지만 편집기로 전송 (항목 수와 관계없이 화면 크기 일정)
+    idx = get_search_index(inv)
+    s1, s2, s3 = st.columns([3, 2, 2])
+    query = s1.text_input(SEARCH_LABEL, key="inv_q")
+    matched = idx.search(inv.df, query)
+    type_counts = idx.facet_counts(inv.df, matched, '타입')
+    status_counts = idx.facet_counts(inv.df, matched, '대여여부')
+    types = s2.multiselect("타입", sorted(set(inv.df['타입'].astype(str)) - {""}), key="inv_types",
+                           format_func=lambda v: f"{v} ({type_counts.get(v, 0)})")
+    statuses = s3.multiselect("대여여부", STATUSES, key="inv_status",
+                              format_func=lambda v: f"{v} ({status_counts.get(v, 0)})")
+    labels = idx.filter(inv.df, matched, 타입=types, 대여여부=statuses)
+    p1, p2 = st.columns([1, 3])
+    page_size = p1.selectbox("페이지당 건수", [20, 50, 100], index=1, key="inv_page_size")
+    page_no = p2.number_input("페이지", min_value=1, value=1, step=1, key="inv_page")
+    page_labels, last_page = paginate(labels, page_no, page_size)
+
+    edit_mode = st.toggle("🔓 수정 및 삭제 요청 모드")
+    edited_df = st.data_editor(
+        to_editable(inv.df.loc[page_labels]), 
+        disabled=(not edit_mode), 
+        hide_index=True, 
+        use_container_width=True,
+        column_config={"ID": None} # ID 숨김
+    )
+    st.caption(f"검색 결과 {len(labels)}건 · {min(int(page_no), last_page)}/{last_page} 페이지")
+
+    if edit_mode:
+        if st.button("💾 모든 변경사항 저장"):
+            save_edits(inv, edited_df)
+            st.success("저장 완료")
+            st.rerun()
+        st.write("---")
+        target_del = st.selectbox("삭제 요청할 장비 선택", edited_df['이름'].unique() if not edited_df.empty else ["없음"])
+        if st.button("🚩 삭제 요청 보내기") and not edited_df.empty:
+            inv.request_delete(target_del)
+            save_inventory(inv)
+            st.warning(f"'{target_del}' 삭제 요청 완료")
+            st.rerun()
+
+# --- 탭 2: 외부 대여 ---
+@st.fragment
+@measured
+def tab_rent():
+    inv = get_inventory()
+    st.subheader("📤 외부 업체 대여 처리")
+    stock_rent = inv.rows('재고')
+    stock_rent = stock_rent[stock_rent['수량'] > 0]
+    if stock_rent.empty:
+        st.warning("대여 가능한 재고가 없습니다.")
+        return
+    stock_rent = search_rows(inv, stock_rent, "q_rent")
+    if not stock_rent.empty:
+        opts_rent = stock_rent['이름'].astype(str) + " - 잔여: " + stock_rent['수량'].astype(str) + "개"
+        sel_rent = st.selectbox("장비 선택", opts_rent.index, format_func=lambda x: opts_rent[x])
+        with st.form("rent_form"):
+            tgt_rent = st.text_input("대여 업체명")
+            qty_rent = st.number_input("대여 수량", 1, int(stock_rent.loc[sel_rent, '수량']), step=1)
+            r_date_rent = st.date_input("반납 예정일")
+            if st.form_submit_button("🛒 장바구니에 담기"):
+                add_to_cart("대여", stock_rent.loc[sel_rent], qty_rent, tgt_rent, str(r_date_rent))
+                st.rerun()
+            if st.form_submit_button("대여 확정"):
+                item_rent = inv.rent(sel_rent, int(qty_rent), tgt_rent, datetime.now().strftime("%Y-%m-%d"), str(r_date_rent))
+                save_inventory(inv)
+                log_transaction("대여", item_rent['이름'], qty_rent, tgt_rent, datetime.now().strftime("%Y-%m-%d"), str(r_date_rent))
+                st.success("대여 처리 완료")
+                st.rerun()
+
+# --- 탭 3: 현장 출고 ---
+@st.fragment
+@measured
+def tab_dispatch():
+    inv = get_inventory()
+    st.subheader("🎬 현장 출고 처리")
+    stock_disp = inv.rows('재고')
+    stock_disp = stock_disp[stock_disp['수량'] > 0]
+    if stock_disp.empty:
+        st.warning("출고 가능한 재고가 없습니다.")
+        return
+    stock_disp = search_rows(inv, stock_disp, "q_disp")
+    if not stock_disp.empty:
+        opts_disp = stock_disp['이름'].astype(str) + " - 잔여: " + stock_disp['수량'].astype(str) + "개"
+        sel_disp = st.selectbox("출고할 장비 선택", opts_disp.index, format_func=lambda x: opts_disp[x])
+        with st.form("dispatch_form"):
+            site_disp = st.text_input("현장명")
+            qty_disp = st.number_input("출고 수량", 1, int(stock_disp.loc[sel_disp, '수량']), step=1)
+            if st.form_submit_button("🛒 장바구니에 담기"):
+                add_to_cart("현장출고", stock_disp.loc[sel_disp], qty_disp, site_disp)
+                st.rerun()
+            if st.form_submit_button("출고 확정"):
+                item_disp = inv.dispatch(sel_disp, int(qty_disp), site_disp, datetime.now().strftime("%Y-%m-%d"))
+                save_inventory(inv)
+                log_transaction("현장출고", item_disp['이름'], qty_disp, site_disp, datetime.now().strftime("%Y-%m-%d"))
+                st.success("출고 처리 완료")
+                st.rerun()
+
+# --- 탭 4: 반납 처리 ---
+@st.fragment
+@measured
+def tab_return():
+    inv = get_inventory()
+    st.subheader("📥 장비 반납 처리")
+    rented_items = inv.rows('대여 중', '현장 출고')
+    if rented_items.empty:
+        st.info("현재 대여 또는 출고 중인 장비가 없습니다.")
+        return
+    rented_items = search_rows(inv, rented_items, "q_ret")
+    if not rented_items.empty:
+        r_opts = ("[" + rented_items['대여여부'].astype(str) + "] " + rented_items['이름'].astype(str) + " - "
+                  + rented_items['대여자'].astype(str) + " (" + rented_items['수량'].astype(str) + "개)")
+        sel_ret = st.selectbox("반납 대상 선택", r_opts.index, format_func=lambda x: r_opts[x])
+        if st.button("🛒 장바구니에 담기", key="cart_ret"):
+            add_to_cart("반납", rented_items.loc[sel_ret], rented_items.loc[sel_ret, '수량'], rented_items.loc[sel_ret, '대여자'])
+            st.rerun()
+        if st.button("반납 확정"):
+            # 같은 이름의 재고 행은 (이름, 대여여부) 인덱스로 바로 조회
+            item_ret = inv.return_item(sel_ret)
+            save_inventory(inv)
+            log_transaction("반납", item_ret['이름'], item_ret['수량'], item_ret['대여자'], datetime.now().strftime("%Y-%m-%d"),
+                            prev_status=str(item_ret['대여여부']))
+            st.success(f"'{item_ret['이름']}' 반납 완료")
+            st.rerun()
+
+# --- 탭 5: 수리/파손 ---
+@st.fragment
+@measured
+def tab_repair():
+    inv = get_inventory()
+    st.subheader("🛠️ 수리 및 파손 관리")
+    m_df = inv.rows('재고', '수리 중', '파손')
+    if m_df.empty:
+        st.info("대상 장비가 없습니다.")
+        return
+    m_df = search_rows(inv, m_df, "q_repair")
+    if not m_df.empty:
+        m_opts = "[" + m_df['대여여부'].astype(str) + "] " + m_df['이름'].astype(str)
+        sel_m = st.selectbox("상태를 변경할 항목 선택", m_opts.index, format_func=lambda x: m_opts[x])
+        new_stat = st.selectbox("변경할 상태", ["재고", "수리 중", "파손"])
+        if st.button("상태 변경 적용"):
+            item_m = inv.set_status(sel_m, new_stat)
+            save_inventory(inv)
+            log_transaction("상태변경", item_m['이름'], item_m['수량'], new_stat, datetime.now().strftime("%Y-%m-%d"),
+                            prev_status=str(item_m['대여여부']))
+            st.success("상태 변경 완료")
+            st.rerun()
+
+# --- 탭 6: 활동 내역 ---
+@st.fragment
+@measured
+def tab_history():
+    st.subheader("📜 활동 기록")
+    f1, f2, f3, f4 = st.columns([2, 2, 2, 2])
+    log_range = f1.date_input("기간", value=(), key="log_range")
+    log_kinds = f2.multiselect("종류", log_filter_options('종류'), key="log_kinds")
+    log_authors = f3.multiselect("작성자", log_filter_options('작성자'), key="log_authors")
+    log_item = f4.text_input("장비이름", key="log_item").strip()
+    log_filters = {
+        'start': log_range[0] if len(log_range) > 0 else None,
+        'end': log_range[1] if len(log_range) > 1 else None,
+        'kinds': log_kinds, 'authors': log_authors, 'item': log_item,
+    }
+    p1, p2 = st.columns([1, 3])
+    page_size = p1.selectbox("페이지당 건수", [20, 50, 100], index=1, key="log_page_size")
+    page_no = p2.number_input("페이지", min_value=1, value=1, step=1, key="log_page")
+    log_page, log_total = query_logs(offset=(int(page_no) - 1) * page_size, limit=page_size, **log_filters)
+    st.dataframe(log_page, use_container_width=True, hide_index=True)
+    last_page = max((log_total - 1) // page_size + 1, 1)
+    st.caption(f"총 {log_total}건 · {int(page_no)}/{last_page} 페이지")
+
+# --- 탭 7: 관리자 페이지 (회원 승인 및 영구 삭제 기능) ---
+@st.fragment
+@measured
+def tab_admin():
+    inv = get_inventory()
+    st.header("👑 관리자 페이지")
+
+    # A. 장비 삭제 승인 구역
+    st.subheader("🗑️ 장비 삭제 요청 승인")
+    del_req_df = inv.df[inv.df['삭제요청'] == 'Y']
+    if not del_req_df.empty:
+        for idx, row in del_req_df.iterrows():
+            col_a, col_b, col_c = st.columns([3, 1, 1])
+            col_a.write(f"📂 **{row['이름']}** | 수량: {row['수량']}")
+            if col_b.button("✅ 승인", key=f"d_ok_{idx}"):
+                item_d = inv.remove(idx)
+                save_inventory(inv)
+                log_transaction("삭제", item_d['이름'], item_d['수량'], item_d['대여자'], datetime.now().strftime("%Y-%m-%d"),
+                                prev_status=str(item_d['대여여부']))
+                st.rerun()
+            if col_c.button("❌ 반려", key=f"d_no_{idx}"):
+                inv.clear_delete_request(idx); save_inventory(inv); st.rerun()
+    else: st.info("현재 대기 중인 장비 삭제 요청이 없습니다.")
+
+    st.write("---")
+
+    # [기능 보강] 회원 관리 섹션 (이 탭을 열 때만 회원 명단을 불러옴)
+    u_df = load_data("Users")
+
+    # B-1. 회원 가입 승인 대기 명단
+    st.subheader("⏳ 회원 가입 승인 대기")
+    if not u_df.empty:
+        pending_users = u_df[~u_df['approved'].isin(['TRUE', '1', 'T'])]
+        if not pending_users.empty:
+            for idx, row in pending_users.iterrows():
+                ca, cb, cc = st.columns([3, 1, 1])
+                birth_val = row.get('birth', '정보없음')
+                ca.write(f"👤 **성명: {row['username']}** | 생년월일: {birth_val}")
+                if cb.button("✅ 최종 가입 승인", key=f"u_ok_{idx}"):
+                    u_df.at[idx, 'approved'] = 'TRUE' # 상태를 TRUE로 변경
+                    try:
+                        save_rows(u_df.loc[[idx]], "Users", "username")
+                    except StorageUnavailable as e:
+                        _handle_unavailable(e)
+                    st.success(f"{row['username']}님 승인 완료")
+                    st.rerun() # 화면 갱신하여 아래 회원 관리 목록으로 이동
+                if cc.button("❌ 가입 거절", key=f"u_no_{idx}"):
+                    try:
+                        delete_rows([row['username']], "Users", "username")
+                    except StorageUnavailable as e:
+                        _handle_unavailable(e)
+                    st.rerun()
+        else: st.info("현재 대기 중인 가입 신청자가 없습니다.")
+
+    st.write("---")
+
+    # B-2. 전체 회원 관리 (퇴사 시 아이디 삭제 기능)
+    st.subheader("👥 전체 회원 관리")
+    if not u_df.empty:
+        # 승인 완료된 사용자만 추출
+        approved_users = u_df[u_df['approved'].isin(['TRUE', '1', 'T'])]
+
+        if not approved_users.empty:
+            # 표 형식으로 회원 명단 표시
+            display_users = approved_users[['username', 'birth', 'role', 'created_at']].copy()
+            display_users.columns = ['성명', '생년월일', '권한', '가입일']
+            st.dataframe(display_users, use_container_width=True, hide_index=True)
+
+            st.write("---")
+            st.caption("❗ 퇴사자 등의 계정을 영구 삭제할 수 있습니다.")
+            # 삭제할 회원 선택 (마스터 admin 계정 제외)
+            manage_list = approved_users[approved_users['username'] != 'admin']['username'].tolist()
+            if manage_list:
+                del_target = st.selectbox("삭제할 회원 계정 선택", manage_list)
+                if st.button("🔥 해당 계정 즉시 삭제"):
+                    try:
+                        delete_rows([del_target], "Users", "username") # 저장소에서 아이디 삭제
+                    except StorageUnavailable as e:
+                        _handle_unavailable(e)
+                    st.error(f"'{del_target}' 회원의 계정이 삭제되었습니다.")
+                    st.rerun()
+            else:
+                st.info("삭제 가능한 일반 회원 계정이 없습니다.")
+        else:
+            st.info("승인 완료된 회원이 없습니다.")
+
+    st.write("---")
+
+    # C. 로그 보관 및 시점 재고 조회
+    st.subheader("🗄️ 로그 보관 및 시점 재고 조회")
+    ca, cb = st.columns([1, 1])
+    hot_days = ca.number_input("로그 시트에 남길 기간 (일)", min_value=1, value=90, step=1, key="hot_days")
+    if cb.button("📦 지난 로그 보관 실행", use_container_width=True):
+        with st.spinner("보관 중..."):
+            result = run_compaction(int(hot_days))
+        months = ", ".join(f"{m} ({n}건)" for m, n in result['archived'].items()) or "없음"
+        st.success(f"{result['cutoff']} 이전 로그 {result['removed']}건 보관 완료 · 파티션: {months} · 스냅샷: {result['snapshot']}")
+    cc, cd = st.columns([1, 1])
+    at_date = cc.date_input("조회 날짜", key="at_date")
+    at_time = cd.time_input("조회 시각", value=datetime.strptime("23:59", "%H:%M").time(), key="at_time")
+    if st.button("🔎 해당 시점 재고 조회"):
+        try:
+            st.dataframe(load_inventory_at(datetime.combine(at_date, at_time)), use_container_width=True, hide_index=True)
+        except ValueError as e:
+            st.error(str(e))
+
+    # D. 저장소 이전 (로컬 SQLite 사용 시 기존 구글 시트 데이터를 가져옴)
+    if os.environ.get("STORAGE_BACKEND", "gsheets").lower() == "sqlite":
+        st.write("---")
+        st.subheader("🚚 구글 시트 데이터 가져오기")
+        st.caption("구글 시트의 재고·회원·활동 로그를 로컬 DB로 복사합니다. 이미 데이터가 있는 표는 덮어쓰기를 선택해야 바뀝니다.")
+        overwrite = st.checkbox("기존 데이터 덮어쓰기", key="migrate_overwrite")
+        if st.button("📥 구글 시트에서 가져오기"):
+            with st.spinner("가져오는 중..."):
+                copied = run_migration(overwrite)
+            st.success("가져오기 완료 · " + (", ".join(f"{k} {v}건" for k, v in copied.items()) or "복사한 표 없음"))
+
+TABS = {
+    "📋 재고 관리": tab_inventory, "📤 외부 대여": tab_rent, "🎬 현장 출고": tab_dispatch,
+    "📥 반납": tab_return, "🛠️ 수리/파손": tab_repair, "📜 내역 관리": tab_history,
+}
+
 def main_app():
-    # 앱 시작 시 장비 데이터 새로 로드
-    st.session_state.df = load_data("Sheet1")
-    # [핵심 보완] 회원 관리 기능을 위해 매 실행 시마다 유저 데이터를 최신으로 동기화
-    u_df_current = load_data("Users")
-    
-    df = st.session_state.df
+    # 장비 데이터 및 재고 인덱스 (공유 캐시 기준). 회원 명단은 관리자 탭에서만 불러옴
+    inv = get_inventory()
     is_admin = (st.session_state.username == "admin")
+    get_snapshot_scheduler()
 
     # --- 사이드바 구역 ---
     with st.sidebar:
@@ -85,18 +708,36 @@ def main_app():
         
         # 데이터 관리 (회원 명단 제외 백업 기능)
         with st.expander("📂 데이터 관리", expanded=False):
-            st.write("시스템 데이터를 엑셀로 백업합니다.")
+            st.write("시스템 데이터를 파일로 백업합니다.")
+            fmt = st.selectbox("형식", available_formats(), key="backup_fmt",
+                               format_func=lambda f: {"xlsx": "엑셀 (xlsx)", "csv": "CSV (zip)", "parquet": "Parquet (zip)"}[f])
+            incremental = st.checkbox("증분 백업 (마지막으로 다운로드한 백업 이후 추가된 로그만)", key="backup_incremental")
             if st.button("📊 백업 파일 생성", use_container_width=True):
                 with st.spinner("파일 생성 중..."):
-                    logs_df = load_data("Logs")
-                    excel_data = to_excel([st.session_state.df, logs_df], ["장비재고", "활동로그"])
-                    st.download_button(
-                        label="📥 엑셀 다운로드",
-                        data=excel_data,
-                        file_name=f"장비관리_백업_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        use_container_width=True
-                    )
+                    path = export_backup(inv, fmt, incremental)
+                    with open(path, "rb") as f:
+                        st.download_button(
+                            label="📥 백업 다운로드",
+                            data=f,
+                            file_name=os.path.basename(path),
+                            mime=FORMATS[fmt][1],
+                            use_container_width=True,
+                            # 실제로 받은 경우에만 증분 백업 워터마크를 전진
+                            on_click=get_backup_manager().confirm, args=(path,)
+                        )
+        # 성능 지표 (R2D2_METRICS=1일 때 관리자에게만 표시)
+        if METRICS_ENABLED and is_admin:
+            with st.expander("📈 성능 지표", expanded=False):
+                last_run = st.session_state.get('last_run_metrics')
+                if last_run is not None:
+                    calls, nbytes, seconds = last_run.totals()
+                    st.caption(f"직전 실행: {last_run.wall * 1000:.0f} ms · 저장소 호출 {calls}회 · {nbytes / 1024:.1f} KB · {seconds * 1000:.0f} ms")
+                    st.dataframe(last_run.as_frame(), use_container_width=True, hide_index=True)
+                st.caption("프로세스 누적")
+                st.dataframe(METRICS.snapshot().as_frame(), use_container_width=True, hide_index=True)
+                backend = get_backend()
+                if getattr(getattr(backend, "backend", backend), "scheduler", None) is not None:
+                    st.caption(f"스케줄러: {get_scheduler().stats}")
         st.write("---")
         if st.button("🚪 로그아웃", use_container_width=True):
             for key in list(st.session_state.keys()): del st.session_state[key]
@@ -106,228 +747,43 @@ def main_app():
 
     # 상단 요약 지표 (정수 표시)
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric("🚚 대여 중", int(df[df['대여여부'] == '대여 중']['수량'].sum()) if not df.empty else 0)
-    c2.metric("🎬 현장 출고", int(df[df['대여여부'] == '현장 출고']['수량'].sum()) if not df.empty else 0)
-    c3.metric("🛠️ 수리 중", int(df[df['대여여부'] == '수리 중']['수량'].sum()) if not df.empty else 0)
-    c4.metric("💔 파손", int(df[df['대여여부'] == '파손']['수량'].sum()) if not df.empty else 0)
-
-    # 탭 메뉴 정의
-    tab_list = ["📋 재고 관리", "📤 외부 대여", "🎬 현장 출고", "📥 반납", "🛠️ 수리/파손", "📜 내역 관리"]
-    if is_admin:
-        tab_list.append("👑 관리자 페이지")
-    
-    tabs = st.tabs(tab_list)
-
-    # --- 탭 1: 재고 관리 ---
-    with tabs[0]:
-        with st.expander("➕ 새 장비 등록"):
-            with st.form("add_form", clear_on_submit=True):
-                col1, col2, col3 = st.columns([1,2,1])
-                t_input = col1.text_input("타입")
-                n_input = col2.text_input("장비명")
-                q_input = col3.number_input("수량", 1, step=1)
-                b_input = st.text_input("브랜드")
-                if st.form_submit_button("등록"):
-                    new_item = {
-                        'ID': str(uuid.uuid4()), '타입': t_input, '이름': n_input, 
-                        '수량': int(q_input), '브랜드': b_input, '대여여부': '재고', '삭제요청': ''
-                    }
-                    st.session_state.df = pd.concat([st.session_state.df, pd.DataFrame([new_item])], ignore_index=True)
-                    save_data(st.session_state.df, "Sheet1")
-                    st.success("등록 완료")
-                    st.rerun()
-        
-        edit_mode = st.toggle("🔓 수정 및 삭제 요청 모드")
-        edited_df = st.data_editor(
-            st.session_state.df, 
-            disabled=(not edit_mode), 
-            hide_index=True, 
-            use_container_width=True,
-            column_config={"ID": None} # ID 숨김
-        )
-        
-        if edit_mode:
-            if st.button("💾 모든 변경사항 저장"):
-                save_data(edited_df, "Sheet1")
-                st.session_state.df = edited_df
-                st.success("저장 완료")
-                st.rerun()
-            st.write("---")
-            target_del = st.selectbox("삭제 요청할 장비 선택", edited_df['이름'].unique() if not edited_df.empty else ["없음"])
-            if st.button("🚩 삭제 요청 보내기") and not edited_df.empty:
-                st.session_state.df.loc[st.session_state.df['이름'] == target_del, '삭제요청'] = 'Y'
-                save_data(st.session_state.df, "Sheet1")
-                st.warning(f"'{target_del}' 삭제 요청 완료")
-                st.rerun()
+    c1.metric("🚚 대여 중", inv.total('대여 중'))
+    c2.metric("🎬 현장 출고", inv.total('현장 출고'))
+    c3.metric("🛠️ 수리 중", inv.total('수리 중'))
+    c4.metric("💔 파손", inv.total('파손'))
 
-    # --- 탭 2: 외부 대여 ---
-    with tabs[1]:
-        st.subheader("📤 외부 업체 대여 처리")
-        stock_rent = st.session_state.df[(st.session_state.df['대여여부'] == '재고') & (st.session_state.df['수량'] > 0)]
-        if not stock_rent.empty:
-            opts_rent = stock_rent.apply(lambda x: f"{x['이름']} - 잔여: {int(x['수량'])}개", axis=1)
-            sel_rent = st.selectbox("장비 선택", opts_rent.index, format_func=lambda x: opts_rent[x])
-            with st.form("rent_form"):
-                tgt_rent = st.text_input("대여 업체명")
-                qty_rent = st.number_input("대여 수량", 1, int(stock_rent.loc[sel_rent, '수량']), step=1)
-                r_date_rent = st.date_input("반납 예정일")
-                if st.form_submit_button("대여 확정"):
-                    item_rent = stock_rent.loc[sel_rent]
-                    st.session_state.df.at[sel_rent, '수량'] -= int(qty_rent)
-                    new_rent_row = item_rent.copy()
-                    new_rent_row.update({
-                        'ID': str(uuid.uuid4()), '수량': int(qty_rent), '대여여부': '대여 중', 
-                        '대여자': tgt_rent, '대여일': datetime.now().strftime("%Y-%m-%d"), 
-                        '반납예정일': str(r_date_rent)
-                    })
-                    st.session_state.df = pd.concat([st.session_state.df, pd.DataFrame([new_rent_row])], ignore_index=True)
-                    save_data(st.session_state.df, "Sheet1")
-                    log_transaction("대여", item_rent['이름'], qty_rent, tgt_rent, datetime.now().strftime("%Y-%m-%d"), str(r_date_rent))
-                    st.success("대여 처리 완료")
+    # 장바구니 (담긴 항목이 있을 때만 표시)
+    cart = st.session_state.get('cart', [])
+    if cart:
+        with st.expander(f"🛒 장바구니 ({len(cart)}건)", expanded=True):
+            for i, e in enumerate(cart):
+                ca, cb = st.columns([5, 1])
+                qty_txt = "" if e['kind'] == '반납' else f" {e['qty']}개"
+                ca.write(f"[{e['kind']}] {e['name']}{qty_txt} → {e['target']}")
+                if cb.button("삭제", key=f"cart_rm_{i}"):
+                    cart.pop(i); st.rerun()
+            cc, cd = st.columns(2)
+            if cc.button("✅ 장바구니 일괄 처리", use_container_width=True):
+                try:
+                    n_done = commit_cart(inv)
+                    st.success(f"{n_done}건 일괄 처리 완료")
                     st.rerun()
-        else: st.warning("대여 가능한 재고가 없습니다.")
-
-    # --- 탭 3: 현장 출고 ---
-    with tabs[2]:
-        st.subheader("🎬 현장 출고 처리")
-        stock_disp = st.session_state.df[(st.session_state.df['대여여부'] == '재고') & (st.session_state.df['수량'] > 0)]
-        if not stock_disp.empty:
-            opts_disp = stock_disp.apply(lambda x: f"{x['이름']} - 잔여: {int(x['수량'])}개", axis=1)
-            sel_disp = st.selectbox("출고할 장비 선택", opts_disp.index, format_func=lambda x: opts_disp[x])
-            with st.form("dispatch_form"):
-                site_disp = st.text_input("현장명")
-                qty_disp = st.number_input("출고 수량", 1, int(stock_disp.loc[sel_disp, '수량']), step=1)
-                if st.form_submit_button("출고 확정"):
-                    item_disp = stock_disp.loc[sel_disp]
-                    st.session_state.df.at[sel_disp, '수량'] -= int(qty_disp)
-                    new_disp_row = item_disp.copy()
-                    new_disp_row.update({
-                        'ID': str(uuid.uuid4()), '수량': int(qty_disp), '대여여부': '현장 출고', 
-                        '대여자': site_disp, '대여일': datetime.now().strftime("%Y-%m-%d")
-                    })
-                    st.session_state.df = pd.concat([st.session_state.df, pd.DataFrame([new_disp_row])], ignore_index=True)
-                    save_data(st.session_state.df, "Sheet1")
-                    log_transaction("현장출고", item_disp['이름'], qty_disp, site_disp, datetime.now().strftime("%Y-%m-%d"))
-                    st.success("출고 처리 완료")
-                    st.rerun()
-        else: st.warning("출고 가능한 재고가 없습니다.")
-
-    # --- 탭 4: 반납 처리 ---
-    with tabs[3]:
-        st.subheader("📥 장비 반납 처리")
-        rented_items = st.session_state.df[st.session_state.df['대여여부'].isin(['대여 중', '현장 출고'])]
-        if not rented_items.empty:
-            r_opts = rented_items.apply(lambda x: f"[{x['대여여부']}] {x['이름']} - {x['대여자']} ({int(x['수량'])}개)", axis=1)
-            sel_ret = st.selectbox("반납 대상 선택", r_opts.index, format_func=lambda x: r_opts[x])
-            if st.button("반납 확정"):
-                item_ret = rented_items.loc[sel_ret]
-                mask = (st.session_state.df['이름'] == item_ret['이름']) & (st.session_state.df['대여여부'] == '재고')
-                if any(mask):
-                    idx_stock = st.session_state.df[mask].index[0]
-                    st.session_state.df.at[idx_stock, '수량'] = int(st.session_state.df.at[idx_stock, '수량']) + int(item_ret['수량'])
-                    st.session_state.df = st.session_state.df.drop(sel_ret).reset_index(drop=True)
-                else:
-                    st.session_state.df.at[sel_ret, '대여여부'] = '재고'
-                    st.session_state.df.at[sel_ret, '대여자'] = ''
-                save_data(st.session_state.df, "Sheet1")
-                log_transaction("반납", item_ret['이름'], item_ret['수량'], item_ret['대여자'], datetime.now().strftime("%Y-%m-%d"))
-                st.success(f"'{item_ret['이름']}' 반납 완료")
-                st.rerun()
-        else:
-            st.info("현재 대여 또는 출고 중인 장비가 없습니다.")
-
-    # --- 탭 5: 수리/파손 ---
-    with tabs[4]:
-        st.subheader("🛠️ 수리 및 파손 관리")
-        m_df = st.session_state.df[st.session_state.df['대여여부'].isin(['재고', '수리 중', '파손'])]
-        if not m_df.empty:
-            m_opts = m_df.apply(lambda x: f"[{x['대여여부']}] {x['이름']}", axis=1)
-            sel_m = st.selectbox("상태를 변경할 항목 선택", m_opts.index, format_func=lambda x: m_opts[x])
-            new_stat = st.selectbox("변경할 상태", ["재고", "수리 중", "파손"])
-            if st.button("상태 변경 적용"):
-                st.session_state.df.at[sel_m, '대여여부'] = new_stat
-                save_data(st.session_state.df, "Sheet1")
-                st.success("상태 변경 완료")
-                st.rerun()
-        else: st.info("대상 장비가 없습니다.")
-
-    # --- 탭 6: 활동 내역 ---
-    with tabs[5]:
-        st.subheader("📜 활동 기록")
-        st.dataframe(load_data("Logs").iloc[::-1], use_container_width=True)
-
-    # --- 탭 7: 관리자 페이지 (회원 승인 및 영구 삭제 기능) ---
-    if is_admin:
-        with tabs[6]:
-            st.header("👑 관리자 페이지")
-            
-            # A. 장비 삭제 승인 구역
-            st.subheader("🗑️ 장비 삭제 요청 승인")
-            del_req_df = st.session_state.df[st.session_state.df['삭제요청'] == 'Y']
-            if not del_req_df.empty:
-                for idx, row in del_req_df.iterrows():
-                    col_a, col_b, col_c = st.columns([3, 1, 1])
-                    col_a.write(f"📂 **{row['이름']}** | 수량: {row['수량']}")
-                    if col_b.button("✅ 승인", key=f"d_ok_{idx}"):
-                        st.session_state.df = st.session_state.df.drop(idx).reset_index(drop=True)
-                        save_data(st.session_state.df, "Sheet1"); st.rerun()
-                    if col_c.button("❌ 반려", key=f"d_no_{idx}"):
-                        st.session_state.df.at[idx, '삭제요청'] = ""; save_data(st.session_state.df, "Sheet1"); st.rerun()
-            else: st.info("현재 대기 중인 장비 삭제 요청이 없습니다.")
-            
-            st.write("---")
-            
-            # [기능 보강] 회원 관리 섹션 (동기화 로직 포함)
-            u_df = load_data("Users")
-            
-            # B-1. 회원 가입 승인 대기 명단
-            st.subheader("⏳ 회원 가입 승인 대기")
-            if not u_df.empty:
-                pending_users = u_df[~u_df['approved'].astype(str).str.upper().isin(['TRUE', '1', 'T'])]
-                if not pending_users.empty:
-                    for idx, row in pending_users.iterrows():
-                        ca, cb, cc = st.columns([3, 1, 1])
-                        birth_val = row.get('birth', '정보없음')
-                        ca.write(f"👤 **성명: {row['username']}** | 생년월일: {birth_val}")
-                        if cb.button("✅ 최종 가입 승인", key=f"u_ok_{idx}"):
-                            u_df.at[idx, 'approved'] = 'TRUE' # 상태를 TRUE로 변경
-                            save_data(u_df, "Users") 
-                            st.success(f"{row['username']}님 승인 완료")
-                            st.rerun() # 화면 갱신하여 아래 회원 관리 목록으로 이동
-                        if cc.button("❌ 가입 거절", key=f"u_no_{idx}"):
-                            u_df = u_df.drop(idx)
-                            save_data(u_df, "Users"); st.rerun()
-                else: st.info("현재 대기 중인 가입 신청자가 없습니다.")
-            
-            st.write("---")
-            
-            # B-2. 전체 회원 관리 (퇴사 시 아이디 삭제 기능)
-            st.subheader("👥 전체 회원 관리")
-            if not u_df.empty:
-                # 승인 완료된 사용자만 추출
-                approved_users = u_df[u_df['approved'].astype(str).str.upper().isin(['TRUE', '1', 'T'])]
-                
-                if not approved_users.empty:
-                    # 표 형식으로 회원 명단 표시
-                    display_users = approved_users[['username', 'birth', 'role', 'created_at']].copy()
-                    display_users.columns = ['성명', '생년월일', '권한', '가입일']
-                    st.dataframe(display_users, use_container_width=True, hide_index=True)
-                    
-                    st.write("---")
-                    st.caption("❗ 퇴사자 등의 계정을 영구 삭제할 수 있습니다.")
-                    # 삭제할 회원 선택 (마스터 admin 계정 제외)
-                    manage_list = approved_users[approved_users['username'] != 'admin']['username'].tolist()
-                    if manage_list:
-                        del_target = st.selectbox("삭제할 회원 계정 선택", manage_list)
-                        if st.button("🔥 해당 계정 즉시 삭제"):
-                            u_df = u_df[u_df['username'] != del_target]
-                            save_data(u_df, "Users") # 구글 시트에서 아이디 삭제
-                            st.error(f"'{del_target}' 회원의 계정이 삭제되었습니다.")
-                            st.rerun()
-                    else:
-                        st.info("삭제 가능한 일반 회원 계정이 없습니다.")
-                else:
-                    st.info("승인 완료된 회원이 없습니다.")
+                except ValueError as e:
+                    # 검증 실패 시 재고는 바뀌지 않음
+                    st.error(str(e))
+                except Exception as e:
+                    # 저장 실패 시 세션 재고는 이미 버렸으므로 다음 실행에서 저장소 기준으로 다시 표시
+                    st.error(f"⚠️ 일괄 처리 중 오류가 발생했습니다. 최신 데이터를 확인한 뒤 다시 시도해 주세요. ({e})")
+            if cd.button("🗑️ 장바구니 비우기", use_container_width=True):
+                st.session_state.cart = []; st.rerun()
+
+    # 탭 메뉴: 선택한 탭만 실행 (탭마다 필요한 시트만 처음 열 때 불러옴)
+    tab = st.radio("메뉴", list(TABS) + (["👑 관리자 페이지"] if is_admin else []),
+                   horizontal=True, key="tab", label_visibility="collapsed")
+    if tab == "👑 관리자 페이지":
+        tab_admin()
+    else:
+        TABS[tab]()
 
 # 4. 로그인 및 회원가입 페이지
 def login_page():
@@ -339,31 +795,44 @@ def login_page():
             if st.form_submit_button("로그인"):
                 if u_name == "admin" and u_pw == "1234":
                     st.session_state.logged_in, st.session_state.username = True, u_name; st.rerun()
-                users = load_data("Users")
+                # 전체 회원 명단 대신 성명 인덱스로 해당 계정만 조회
+                try:
+                    users = normalize(get_backend().find("Users", username=u_name), "Users")
+                except StorageUnavailable as e:
+                    _storage_error(e)
                 hashed_pw = hashlib.sha256(u_pw.encode()).hexdigest()
                 if not users.empty:
-                    user_match = users[(users['username'].astype(str) == str(u_name)) & (users['password'].astype(str) == str(hashed_pw))]
+                    user_match = users[users['password'].astype(str) == str(hashed_pw)]
                     if not user_match.empty:
                         # 승인 여부 체크
-                        if str(user_match.iloc[0]['approved']).upper() in ['TRUE', '1', 'T']:
+                        if user_match.iloc[0]['approved'] in ['TRUE', '1', 'T']:
                             st.session_state.logged_in, st.session_state.username = True, u_name; st.rerun()
                         else:
                             st.error("관리자의 가입 승인이 필요합니다.")
                     else: st.error("정보 불일치")
+                else: st.error("정보 불일치")
     else:
         with st.form("signup"):
             new_n, new_b = st.text_input("성명"), st.date_input("생년월일", min_value=datetime(1950, 1, 1))
             new_p = st.text_input("비밀번호 설정", type="password")
             if st.form_submit_button("신청 완료"):
-                users_db = load_data("Users")
                 hp = hashlib.sha256(new_p.encode()).hexdigest()
                 new_user = {'username': new_n, 'birth': str(new_b), 'password': hp, 'role': '사용자', 'approved': 'FALSE', 'created_at': datetime.now().strftime("%Y-%m-%d")}
-                save_data(pd.concat([users_db, pd.DataFrame([new_user])], ignore_index=True), "Users")
+                try:
+                    append_rows(pd.DataFrame([new_user]), "Users")
+                except StorageUnavailable as e:
+                    _storage_error(e)
                 st.success("신청 완료! 승인 후 이용 가능합니다.")
 
 # 5. 앱 실행 제어부
 if __name__ == '__main__':
-    if 'logged_in' not in st.session_state: st.session_state.logged_in = False
-    if st.session_state.logged_in: main_app()
-    else: login_page()
+    if METRICS_ENABLED: METRICS.start(st.session_state.get('username', ''))
+    try:
+        if 'logged_in' not in st.session_state: st.session_state.logged_in = False
+        if st.session_state.logged_in: main_app()
+        else: login_page()
+    finally:
+        # 이번 실행의 저장소 호출 지표 (다음 실행에서 관리자 패널에 표시)
+        if METRICS_ENABLED:
+            st.session_state.last_run_metrics = METRICS.stop()
 
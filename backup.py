@@ -0,0 +1,202 @@
+import glob
+import json
+import os
+import threading
+import zipfile
+from io import TextIOWrapper
+import pandas as pd
+
+# 백업 형식: (확장자, MIME)
+FORMATS = {
+    "xlsx": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": (".zip", "application/zip"),
+    "parquet": (".zip", "application/zip"),
+}
+CHUNK_SIZE = 5000
+
+
+def available_formats():
+    formats = ["xlsx", "csv"]
+    try:
+        import pyarrow.parquet  # noqa: F401
+        formats.append("parquet")
+    except ImportError:
+        pass
+    return formats
+
+
+# 메모리에 있는 표를 (조각, 다음 커서) 형태로 나눔. 커서는 이미 백업한 행 수
+def frame_chunks(df, chunk_size=CHUNK_SIZE, cursor=0):
+    for start in range(int(cursor or 0), len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        yield chunk, start + len(chunk)
+
+
+# 표 내용의 버전 표시값 (export의 key용). 같은 내용이면 같은 값
+# 객체 주소나 리비전이 없는 저장소에서도 로그 없이 바뀐 재고(편집기 저장, 삭제 요청 등)를 구분
+def frame_key(df):
+    hashed = pd.util.hash_pandas_object(df, index=False)
+    return (len(df), tuple(map(str, df.columns)), int(hashed.sum()))
+
+
+# 1. 형식별 스트리밍 기록 (조각 단위로 파일에 바로 씀)
+def _write_xlsx(path, sheets):
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    for name, columns, chunks in sheets:
+        ws = wb.create_sheet(title=name)
+        ws.append(list(columns))
+        for chunk in chunks:
+            chunk = chunk.reindex(columns=columns)
+            for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+                ws.append([_excel_value(v) for v in row])
+    wb.save(path)
+
+
+def _excel_value(v):
+    if v is None or isinstance(v, (str, int, float, bool)):
+        return v
+    if hasattr(v, "item"):
+        return v.item()
+    return str(v)
+
+
+def _write_csv_zip(path, sheets):
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, columns, chunks in sheets:
+            with zf.open(f"{name}.csv", "w") as raw:
+                # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+                text = TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+                first = True
+                for chunk in chunks:
+                    chunk.reindex(columns=columns).to_csv(text, index=False, header=first)
+                    first = False
+                if first:
+                    text.write(",".join(columns) + "\n")
+                text.flush()
+                text.detach()
+
+
+def _write_parquet_zip(path, sheets):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as zf:
+        for name, columns, chunks in sheets:
+            with zf.open(f"{name}.parquet", "w", force_zip64=True) as raw:
+                # 열 타입이 조각마다 달라지지 않도록 문자열로 통일해 기록
+                schema = pa.schema([(str(c), pa.string()) for c in columns])
+                writer = pq.ParquetWriter(raw, schema)
+                for chunk in chunks:
+                    chunk = chunk.reindex(columns=columns).astype(str).replace({"nan": "", "NaT": "", "None": ""})
+                    writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                writer.close()
+
+
+_WRITERS = {"xlsx": _write_xlsx, "csv": _write_csv_zip, "parquet": _write_parquet_zip}
+
+
+# 2. 백업 관리자 (프로세스 전역)
+# - 결과 파일은 backup_dir에 기록하고, 같은 데이터 버전(key)이면 다시 만들지 않음
+# - 증분 백업은 마지막으로 다운로드된 백업 이후 추가된 로그만 담고, 커서(워터마크)를 상태 파일에 보관
+# - 워터마크는 파일을 만들 때가 아니라 다운로드가 확인될 때(confirm) 전진하므로
+#   만들기만 하고 받지 않은 백업의 로그는 다음 증분 백업에 다시 포함됨
+# - 증분 파일은 더 새로운 전체 백업이 생길 때까지 지우지 않음 (전체 백업은 최근 keep개만 유지)
+class BackupManager:
+    def __init__(self, backup_dir, keep=5):
+        self.backup_dir = backup_dir
+        self.keep = keep
+        self.state_path = os.path.join(backup_dir, "backup_state.json")
+        self._lock = threading.Lock()
+        self._artifacts = {}
+        # 파일별 마지막 로그 커서 (다운로드 확인 시 워터마크로 사용)
+        self._ends = {}
+        os.makedirs(backup_dir, exist_ok=True)
+
+    def _load_state(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def _save_state(self, state):
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_path)
+
+    def watermark(self):
+        return self._load_state().get("logs_cursor")
+
+    # 로그 앞쪽 행이 보관(삭제)되어 행 위치가 당겨졌을 때 워터마크도 함께 당김
+    def rebase(self, removed):
+        with self._lock:
+            state = self._load_state()
+            if state.get("logs_cursor") is not None:
+                state["logs_cursor"] = max(int(state["logs_cursor"]) - int(removed), 0)
+                self._save_state(state)
+            self._ends = {p: max(int(c) - int(removed), 0) for p, c in self._ends.items()}
+            self._artifacts.clear()
+
+    # inventory: 재고 표, log_columns: 로그 열 목록
+    # log_chunks(cursor): 커서 이후 로그를 (조각, 다음 커서)로 내주는 함수
+    # key: 데이터 버전 표시값 (바뀌지 않았으면 기존 파일 재사용)
+    def export(self, fmt, inventory, log_columns, log_chunks, key, incremental=False, stamp=""):
+        with self._lock:
+            cursor = self.watermark() if incremental else None
+            cache_key = (fmt, incremental, key, cursor)
+            path = self._artifacts.get(cache_key)
+            if path and os.path.exists(path):
+                return path
+            ext = FORMATS[fmt][0]
+            kind = "증분" if incremental else "전체"
+            path = os.path.join(self.backup_dir, f"장비관리_백업_{kind}_{stamp}{ext}")
+            tracker = {"cursor": cursor}
+
+            def logs():
+                for chunk, next_cursor in log_chunks(cursor):
+                    tracker["cursor"] = next_cursor
+                    yield chunk
+
+            sheets = [
+                ("장비재고", list(inventory.columns), (c for c, _ in frame_chunks(inventory))),
+                ("활동로그", list(log_columns), logs()),
+            ]
+            tmp = path + ".part"
+            _WRITERS[fmt](tmp, sheets)
+            os.replace(tmp, path)
+            if tracker["cursor"] is not None:
+                self._ends[path] = tracker["cursor"]
+            self._artifacts[cache_key] = path
+            self._cleanup()
+            return path
+
+    # 백업 파일이 다운로드되었을 때 호출: 그 파일에 담긴 마지막 로그까지 워터마크를 전진
+    # 여러 관리자가 만든 파일의 순서가 섞여도 워터마크는 뒤로 가지 않음
+    def confirm(self, path):
+        with self._lock:
+            end = self._ends.get(path)
+            if end is None:
+                return False
+            state = self._load_state()
+            current = state.get("logs_cursor")
+            if current is None or int(end) > int(current):
+                state["logs_cursor"] = end
+                self._save_state(state)
+            return True
+
+    # 전체 백업은 최근 keep개만 남기고, 증분 백업은 더 새로운 전체 백업이 있을 때만 정리
+    def _cleanup(self):
+        files = sorted(glob.glob(os.path.join(self.backup_dir, "장비관리_백업_*")), key=os.path.getmtime)
+        full = [f for f in files if os.path.basename(f).startswith("장비관리_백업_전체_")]
+        latest_full = os.path.getmtime(full[-1]) if full else None
+        stale = full[:-self.keep] + [
+            f for f in files
+            if os.path.basename(f).startswith("장비관리_백업_증분_") and latest_full is not None and os.path.getmtime(f) < latest_full
+        ]
+        for old in stale:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+            self._ends.pop(old, None)
+        self._artifacts = {k: v for k, v in self._artifacts.items() if os.path.exists(v)}
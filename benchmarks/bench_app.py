@@ -0,0 +1,181 @@
+# 주요 사용자 흐름 벤치마크 (메모리 가짜 구글 시트 + Streamlit AppTest)
+# 실행: python benchmarks/bench_app.py [재고 행 수 ...] [--logs 로그 행 수,...] [--latency 초]
+# 예: python benchmarks/bench_app.py 1000 10000 100000 --logs 1000,100000 --latency 0.05
+# 작업마다 저장소 호출(작업별), 가짜 연결에서 센 Sheets API 요청 수/셀 수/주고받은 데이터(KB),
+# 소요 시간, 최대 메모리를 출력합니다.
+# 백그라운드 로그 전송은 각 작업 안에서 flush_all()로 끝까지 보내므로 그 작업의 비용으로 집계됩니다.
+# 최대 메모리는 tracemalloc 기준이므로 측정 중 소요 시간에는 추적 비용이 조금 포함됩니다.
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+APP = os.path.join(ROOT, "app.py")
+
+ACTIONS = ["로그인", "대여", "현장 출고", "반납", "장바구니 일괄 처리", "내역 조회", "백업"]
+
+# 장바구니 일괄 처리 작업의 항목 수 (대여 10 · 현장출고 5 · 반납 5)
+CART_SIZE = (10, 5, 5)
+
+
+def _button(at, label):
+    return next(b for b in at.button if b.label == label)
+
+
+def _text(at, label, value):
+    next(t for t in at.text_input if t.label == label).set_value(value)
+
+
+def _tab(at, name):
+    at.radio(key="tab").set_value(name)
+
+
+# 각 작업은 AppTest 조작 후 run() 한 번(필요 시 확정 후 재실행 포함)으로 구성
+def login(at):
+    from fakes import BENCH_USER
+    _text(at, "성명 (ID)", BENCH_USER[0])
+    _text(at, "비밀번호 (PW)", BENCH_USER[1])
+    _button(at, "로그인").click().run()
+
+
+def rent(at):
+    _tab(at, "📤 외부 대여")
+    at.run()
+    _text(at, "대여 업체명", "벤치업체")
+    _button(at, "대여 확정").click().run()
+
+
+def dispatch(at):
+    _tab(at, "🎬 현장 출고")
+    at.run()
+    _text(at, "현장명", "벤치현장")
+    _button(at, "출고 확정").click().run()
+
+
+def return_item(at):
+    _tab(at, "📥 반납")
+    at.run()
+    _button(at, "반납 확정").click().run()
+
+
+# 여러 행이 한 번에 바뀌는 경로: 장바구니에 대여(일부 수량)/출고/반납을 섞어 담고 한 번에 저장
+# (AppTest는 data_editor 입력을 지원하지 않으므로 편집 화면 대신 장바구니로 다중 행 변경분을 만듦)
+def fill_cart(at, conn):
+    sheet = conn.sheets["Sheet1"]
+    n_rent, n_disp, n_ret = CART_SIZE
+    cart = []
+    # 앞선 작업들은 검색 결과 첫 항목을 쓰므로 뒤쪽 행에서 고름
+    for _, row in sheet.iloc[::-1].iterrows():
+        status, qty = row['대여여부'], int(row['수량'] or 0)
+        if status == '재고' and qty >= 2 and n_rent:
+            kind, qty, n_rent = "대여", 1, n_rent - 1
+        elif status == '재고' and n_disp:
+            kind, n_disp = "현장출고", n_disp - 1
+        elif status in ('대여 중', '현장 출고') and n_ret:
+            kind, n_ret = "반납", n_ret - 1
+        else:
+            continue
+        cart.append({'kind': kind, 'id': row['ID'], 'name': row['이름'], 'qty': qty,
+                     'target': "벤치일괄", 'return_date': ''})
+        if not (n_rent or n_disp or n_ret):
+            break
+    at.session_state["cart"] = cart
+    at.run()
+
+
+def commit_cart(at):
+    _button(at, "✅ 장바구니 일괄 처리").click().run()
+
+
+def history(at):
+    _tab(at, "📜 내역 관리")
+    at.run()
+
+
+def backup(at):
+    _button(at, "📊 백업 파일 생성").click().run()
+
+
+FLOWS = dict(zip(ACTIONS, [login, rent, dispatch, return_item, commit_cart, history, backup]))
+# 측정 전에 실행할 준비 단계 (시간/호출 수에 포함하지 않음)
+SETUPS = {"장바구니 일괄 처리": fill_cart}
+
+
+def run_suite(rows, log_rows, latency):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+    from instrumentation import METRICS
+    from fakes import FakeGSheetsConnection
+    from logs import flush_all
+
+    work = tempfile.mkdtemp(prefix="r2d2_bench_")
+    os.environ.update({
+        "STORAGE_BACKEND": "fake", "R2D2_METRICS": "1",
+        "FAKE_ROWS": str(rows), "FAKE_LOG_ROWS": str(log_rows), "FAKE_LATENCY": str(latency),
+        "SHEETS_QUOTA_PER_MIN": "1000000", "SHEETS_BURST": "1000",
+        "LOG_SPOOL_PATH": os.path.join(work, "spool.jsonl"), "BACKUP_DIR": os.path.join(work, "backups"),
+        "ARCHIVE_DIR": os.path.join(work, "archive"), "SNAPSHOT_INTERVAL_HOURS": "0",
+    })
+    # 이전 크기의 저장소/캐시를 버리고 새로 생성
+    st.cache_resource.clear()
+    METRICS.reset()
+    FakeGSheetsConnection.latest = None
+    at = AppTest.from_file(APP, default_timeout=600)
+    at.run()
+    conn = None
+    results = []
+    for name, flow in FLOWS.items():
+        if name in SETUPS:
+            SETUPS[name](at, conn)
+        flush_all()
+        before = METRICS.snapshot()
+        conn_before = (conn.requests(), conn.cells, conn.bytes) if conn else (0, 0, 0)
+        tracemalloc.start()
+        started = time.perf_counter()
+        flow(at)
+        flush_all()
+        wall = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if at.exception:
+            raise RuntimeError(f"{name}: {at.exception[0].value}")
+        if conn is None:
+            # 첫 작업(로그인)에서 저장소가 만들어짐
+            conn = FakeGSheetsConnection.latest
+        diff = METRICS.snapshot().since(before)
+        requests, cells, nbytes = conn.requests(), conn.cells, conn.bytes
+        results.append({
+            "작업": name,
+            "저장소 호출": " ".join(f"{op}×{c}" for op, (c, _, _) in sorted(diff.ops.items())) or "-",
+            "API 요청": requests - conn_before[0],
+            "셀": cells - conn_before[1],
+            "KB": round((nbytes - conn_before[2]) / 1024, 1),
+            "ms": round(wall * 1000, 1),
+            "최대 MB": round(peak / 2**20, 1),
+        })
+    return results
+
+
+def main(argv):
+    sizes, log_sizes, latency = [], None, 0.0
+    args = iter(argv)
+    for arg in args:
+        if arg == "--logs":
+            log_sizes = [int(v) for v in next(args).split(",")]
+        elif arg == "--latency":
+            latency = float(next(args))
+        else:
+            sizes.append(int(arg))
+    sizes = sizes or [1000, 10000, 100000]
+    import pandas as pd
+    for rows in sizes:
+        for log_rows in (log_sizes or [rows]):
+            print(f"\n== 재고 {rows:,}행 · 로그 {log_rows:,}행 · 지연 {latency}s ==")
+            print(pd.DataFrame(run_suite(rows, log_rows, latency)).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
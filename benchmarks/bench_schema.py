@@ -0,0 +1,65 @@
+# load_data 정규화 마이크로 벤치마크 (기존 셀 단위 applymap 방식 vs 선언형 스키마)
+# 실행: python benchmarks/bench_schema.py [행 수]
+import os
+import sys
+import time
+import random
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from schema import FIELD_NAMES, STATUSES, normalize
+
+
+def make_inventory(rows, seed=0):
+    rng = random.Random(seed)
+    types = [f" 타입{i} " for i in range(30)]
+    brands = [f"브랜드{i} " for i in range(80)]
+    data = {
+        'ID': [f"id-{i}" for i in range(rows)],
+        '타입': [rng.choice(types) for _ in range(rows)],
+        '이름': [f" 장비 {i % 5000} " for i in range(rows)],
+        '수량': [str(rng.randint(0, 40)) if i % 97 else "" for i in range(rows)],
+        '브랜드': [rng.choice(brands) for _ in range(rows)],
+        '특이사항': ["" if i % 3 else " 메모 " for i in range(rows)],
+        '대여업체': ["" for _ in range(rows)],
+        '대여여부': [rng.choice(STATUSES) + " " for _ in range(rows)],
+        '대여자': ["" if i % 4 else " 홍길동" for i in range(rows)],
+        '대여일': ["" if i % 4 else "2024-03-01" for i in range(rows)],
+        '반납예정일': ["" if i % 4 else "2024-03-15" for i in range(rows)],
+        '출고비고': ["" for _ in range(rows)],
+        '사진': ["" for _ in range(rows)],
+        '삭제요청': ["" for _ in range(rows)],
+    }
+    # conn.read()와 같이 문자열 열로 구성된 프레임
+    return pd.DataFrame(data, columns=FIELD_NAMES)
+
+
+# 변경 전 load_data의 Sheet1 처리 방식
+def legacy_normalize(df):
+    df = df.fillna("")
+    cellwise = getattr(df, "map", None) or df.applymap
+    df = cellwise(lambda x: x.strip() if isinstance(x, str) else x)
+    df['수량'] = pd.to_numeric(df['수량'], errors='coerce').fillna(0).astype(int)
+    return df
+
+
+def bench(fn, df, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(df.copy())
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    raw = make_inventory(rows)
+    t_old, old = bench(legacy_normalize, raw)
+    t_new, new = bench(lambda d: normalize(d, "Sheet1"), raw)
+    mb_old = old.memory_usage(deep=True).sum() / 1e6
+    mb_new = new.memory_usage(deep=True).sum() / 1e6
+    print(f"rows={rows}")
+    print(f"legacy applymap : {t_old * 1000:8.1f} ms  {mb_old:7.1f} MB")
+    print(f"schema normalize: {t_new * 1000:8.1f} ms  {mb_new:7.1f} MB")
+    print(f"speedup x{t_old / t_new:.1f}, memory x{mb_old / mb_new:.1f} smaller")
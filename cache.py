@@ -0,0 +1,75 @@
+import threading
+import time
+
+
+# 프로세스 전역 시트 캐시 (모든 사용자 세션이 공유)
+# - 저장소가 버전(리비전)을 제공하면 버전이 바뀔 때만 다시 읽고,
+#   제공하지 않으면(구글 시트) ttl 초 동안 재사용합니다.
+# - 같은 시트에 대한 동시 미스는 한 번의 읽기로 합쳐집니다(single-flight).
+class SheetCache:
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._entries = {}
+        # 무효화와 무관하게 마지막으로 읽어온 값 (저장소 장애 시 대체용)
+        self._last_good = {}
+        self._generations = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key):
+        with self._lock:
+            if key not in self._key_locks:
+                self._key_locks[key] = threading.Lock()
+            return self._key_locks[key]
+
+    def _fresh(self, entry, version):
+        if entry is None:
+            return False
+        cached_version, loaded_at, _ = entry
+        if version is not None:
+            return cached_version == version
+        return time.monotonic() - loaded_at < self.ttl
+
+    def get(self, key, loader, version=None):
+        entry = self._entries.get(key)
+        if self._fresh(entry, version):
+            return entry[2]
+        with self._key_lock(key):
+            # 대기하는 동안 다른 세션이 이미 읽어왔다면 그 결과를 사용
+            entry = self._entries.get(key)
+            if self._fresh(entry, version):
+                return entry[2]
+            generation = self._generations.get(key, 0)
+            value = loader()
+            with self._lock:
+                # 읽는 도중 쓰기가 있었다면 오래된 결과를 보관하지 않음
+                if self._generations.get(key, 0) == generation:
+                    self._entries[key] = (version, time.monotonic(), value)
+                self._last_good[key] = value
+            return value
+
+    # 방금 저장한 내용을 그대로 캐시에 반영 (write-through). 파생 항목은 무효화
+    def put(self, key, value, version=None):
+        self.invalidate(key)
+        with self._lock:
+            self._entries[key] = (version, time.monotonic(), value)
+            self._last_good[key] = value
+        return value
+
+    # 만료/무효화 여부와 관계없이 마지막 값 (없으면 None)
+    def peek(self, key):
+        return self._last_good.get(key)
+
+    # 시트 키와 함께 그 시트에서 파생된 항목("Logs:..." 등)도 무효화
+    def invalidate(self, key):
+        with self._lock:
+            keys = {key} | {k for k in self._entries if str(k).startswith(f"{key}:")}
+            for k in keys:
+                self._generations[k] = self._generations.get(k, 0) + 1
+                self._entries.pop(k, None)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._generations[key] = self._generations.get(key, 0) + 1
+            self._entries.clear()
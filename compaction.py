@@ -0,0 +1,263 @@
+import glob
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 활동 로그 보관(압축) 및 시점 재고 복원
+# - compact(): 핫 윈도(최근 hot_days일)가 시작되는 달 이전의 지난 달 로그를 월별 파티션(logs_YYYY-MM)으로
+#   옮기고 원본 로그 시트에서는 삭제합니다. 실행할 때마다 재고 스냅샷(snapshot_YYYYMMDD_HHMMSS)도 남깁니다.
+# - SnapshotScheduler: 보관 실행과 별도로 일정 간격마다 재고 스냅샷을 남깁니다.
+#   스냅샷은 최근 keep개만 유지합니다 (같은 스프레드시트에 보관할 때 셀 한도를 넘지 않도록).
+# - inventory_at(): 가장 가까운 스냅샷(현재 재고 포함)에서 로그를 앞/뒤로 재생해 특정 시점의
+#   (이름, 대여여부, 대여자)별 수량을 복원합니다. 편집기에서 직접 고친 수량 등 로그가 없는 변경은
+#   재생되지 않으므로 스냅샷 사이 구간에서만 오차가 생길 수 있습니다.
+# - 보관 저장소마다 잠금(lock)이 하나 있어 보관 실행과 스냅샷 스레드가 목록을 동시에 고치지 않습니다.
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+SNAPSHOT_FORMAT = "%Y%m%d_%H%M%S"
+SNAPSHOT_KEEP = 7
+HELD = ('대여 중', '현장 출고')
+
+
+# 1. 보관 저장소
+# 로컬 디렉터리에 파티션별 파일로 보관 (pyarrow가 있으면 Parquet, 없으면 압축 CSV)
+class FileArchive:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        try:
+            import pyarrow  # noqa: F401
+            self.ext = ".parquet"
+        except ImportError:
+            self.ext = ".csv.gz"
+
+    def _file(self, name):
+        return os.path.join(self.path, name + self.ext)
+
+    def names(self):
+        return sorted(os.path.basename(p)[:-len(self.ext)] for p in glob.glob(os.path.join(self.path, "*" + self.ext)))
+
+    def read(self, name):
+        if self.ext == ".parquet":
+            return pd.read_parquet(self._file(name))
+        return pd.read_csv(self._file(name), dtype=str, keep_default_na=False)
+
+    def write(self, name, df):
+        df = df.fillna("").astype(str)
+        tmp = self._file(name) + ".tmp"
+        if self.ext == ".parquet":
+            df.to_parquet(tmp, index=False)
+        else:
+            df.to_csv(tmp, index=False, compression="gzip")
+        os.replace(tmp, self._file(name))
+
+    def delete(self, name):
+        try:
+            os.remove(self._file(name))
+        except FileNotFoundError:
+            pass
+
+
+# 저장소(구글 시트 워크시트 / SQLite 테이블)에 파티션별 시트로 보관. 목록은 Archive 시트에 기록
+class SheetArchive:
+    def __init__(self, backend, catalog="Archive"):
+        self.backend = backend
+        self.catalog = catalog
+        self.lock = threading.RLock()
+
+    # 첫 보관 전에는 목록 시트가 없을 수 있음. 그 밖의 읽기 오류는 그대로 올림
+    # (빈 목록으로 간주하고 다시 쓰면 기존 파티션/스냅샷이 목록에서 빠져 복원/정리 대상에서 사라짐)
+    def _catalog(self):
+        try:
+            return self.backend.read(self.catalog)
+        except Exception as e:
+            if type(e).__name__ != "WorksheetNotFound":
+                raise
+            return pd.DataFrame(columns=['이름', '건수', '생성시간'])
+
+    def names(self):
+        cat = self._catalog()
+        return sorted(cat['이름'].astype(str)) if '이름' in cat.columns else []
+
+    def read(self, name):
+        return self.backend.read(name)
+
+    # 목록을 먼저 읽어 두어 목록을 읽을 수 없을 때 목록에 없는 파티션 시트가 생기지 않게 함
+    def write(self, name, df):
+        cat = self._catalog()
+        self.backend.write(name, df)
+        if '이름' in cat.columns:
+            cat = cat[cat['이름'].astype(str) != name]
+        row = pd.DataFrame([{'이름': name, '건수': len(df), '생성시간': datetime.now().strftime(TIME_FORMAT)}])
+        self.backend.write(self.catalog, pd.concat([cat, row], ignore_index=True))
+
+    def delete(self, name):
+        cat = self._catalog()
+        self.backend.drop(name)
+        if '이름' in cat.columns:
+            self.backend.write(self.catalog, cat[cat['이름'].astype(str) != name].reset_index(drop=True))
+
+
+# 2. 보관 작업
+def take_snapshot(backend, archive, now=None, sheet_name="Sheet1"):
+    now = now or datetime.now()
+    name = f"snapshot_{now.strftime(SNAPSHOT_FORMAT)}"
+    archive.write(name, backend.read(sheet_name))
+    return name
+
+
+def snapshot_times(archive):
+    return sorted(datetime.strptime(n[len("snapshot_"):], SNAPSHOT_FORMAT)
+                  for n in archive.names() if n.startswith("snapshot_"))
+
+
+# 오래된 스냅샷부터 지워 최근 keep개만 남김. 지운 이름 목록을 반환
+def prune_snapshots(archive, keep=SNAPSHOT_KEEP):
+    names = sorted(n for n in archive.names() if n.startswith("snapshot_"))
+    stale = names[:-keep] if keep > 0 else names
+    for name in stale:
+        archive.delete(name)
+    return stale
+
+
+def compact(backend, archive, hot_days=90, now=None, sheet_name="Logs", keep_snapshots=SNAPSHOT_KEEP):
+    now = now or datetime.now()
+    # 핫 윈도 시작일이 속한 달의 1일 이전 = 이미 끝난 달만 보관
+    cutoff = (now - timedelta(days=hot_days)).strftime("%Y-%m-01")
+    with archive.lock:
+        snapshot = take_snapshot(backend, archive, now)
+        prune_snapshots(archive, keep_snapshots)
+        logs = backend.read(sheet_name)
+        archived = {}
+        if not logs.empty and '시간' in logs.columns:
+            times = logs['시간'].astype(str).str.strip()
+            old = times.ne("") & (times < cutoff)
+            existing = set(archive.names())
+            for month, part in logs[old].groupby(times[old].str[:7], sort=True):
+                name = f"logs_{month}"
+                if name in existing:
+                    # 이전 실행이 보관 후 삭제 전에 중단됐다면 같은 행이 다시 들어오므로 중복 제거
+                    part = pd.concat([archive.read(name), part.astype(str)], ignore_index=True).drop_duplicates()
+                archive.write(name, part.sort_values('시간', kind="stable"))
+                archived[month] = len(part)
+        removed = backend.delete_before(sheet_name, '시간', cutoff) if archived else 0
+    return {'cutoff': cutoff, 'snapshot': snapshot, 'archived': archived, 'removed': removed}
+
+
+# 일정 간격 스냅샷 (프로세스 전역 백그라운드 스레드)
+# 마지막 스냅샷이 interval_hours보다 오래됐으면 새로 남기고 오래된 스냅샷을 정리합니다.
+# 실패하면 기록만 하고 다음 확인 때(최대 1시간 후) 다시 시도합니다.
+class SnapshotScheduler:
+    def __init__(self, backend, archive, interval_hours=24, keep=SNAPSHOT_KEEP, sheet_name="Sheet1"):
+        self.backend = backend
+        self.archive = archive
+        self.interval = timedelta(hours=interval_hours)
+        self.keep = keep
+        self.sheet_name = sheet_name
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="snapshot", daemon=True)
+        self._thread.start()
+
+    def run_once(self, now=None):
+        now = now or datetime.now()
+        # compact()와 같은 보관 저장소 잠금을 사용
+        with self.archive.lock:
+            times = snapshot_times(self.archive)
+            if times and now - times[-1] < self.interval:
+                return None
+            name = take_snapshot(self.backend, self.archive, now, self.sheet_name)
+            prune_snapshots(self.archive, self.keep)
+            return name
+
+    def _run(self):
+        wait = min(self.interval.total_seconds(), 3600)
+        while True:
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("재고 스냅샷 생성 실패")
+            if self._stop.wait(wait):
+                return
+
+    def stop(self):
+        self._stop.set()
+
+
+# 3. 시점 재고 복원
+# 로그 한 건이 (이름, 대여여부, 대여자)별 수량에 주는 변화
+def _moves(row):
+    kind, name, target = str(row.get('종류', '')), str(row.get('장비이름', '')), str(row.get('대상', ''))
+    prev = str(row.get('이전상태', '') or '')
+    try:
+        qty = int(float(row.get('수량', 0) or 0))
+    except ValueError:
+        qty = 0
+    stock = (name, '재고', '')
+    if kind == '등록':
+        return [(stock, qty)]
+    if kind == '대여':
+        return [(stock, -qty), ((name, '대여 중', target), qty)]
+    if kind == '현장출고':
+        return [(stock, -qty), ((name, '현장 출고', target), qty)]
+    if kind == '반납':
+        # 이전상태가 없는 예전 로그는 대여 중이었던 것으로 간주
+        return [((name, prev or '대여 중', target), -qty), (stock, qty)]
+    if kind == '상태변경':
+        return [(_key(name, prev, ''), -qty), (_key(name, target, ''), qty)]
+    if kind == '삭제':
+        return [(_key(name, prev or '재고', target), -qty)]
+    return []
+
+
+def _key(name, status, holder):
+    return (name, status, holder if status in HELD else '')
+
+
+def _state(df):
+    state = {}
+    if df.empty:
+        return state
+    qty = pd.to_numeric(df['수량'], errors='coerce').fillna(0).astype(int)
+    for name, status, holder, q in zip(df['이름'].astype(str), df['대여여부'].astype(str), df['대여자'].fillna("").astype(str), qty):
+        key = _key(name.strip(), status.strip(), holder.strip())
+        state[key] = state.get(key, 0) + q
+    return state
+
+
+def _to_time(ts):
+    if isinstance(ts, str):
+        return ts
+    return ts.strftime(TIME_FORMAT)
+
+
+# ts 시점의 재고. current=(시간, 재고 표)를 주면 현재 재고도 기준점으로 사용
+def inventory_at(backend, archive, ts, current=None, sheet_name="Logs"):
+    ts = _to_time(ts)
+    points = [(t.strftime(TIME_FORMAT), f"snapshot_{t.strftime(SNAPSHOT_FORMAT)}") for t in snapshot_times(archive)]
+    if current is not None:
+        points.append((_to_time(current[0]), None))
+    if not points:
+        raise ValueError("기준이 될 재고 스냅샷이 없습니다.")
+    # 문자열 시간("YYYY-MM-DD HH:MM:SS")을 초 단위로 비교해 가장 가까운 기준점 선택
+    target = datetime.strptime(ts, TIME_FORMAT)
+    base_time, base_name = min(points, key=lambda p: abs((datetime.strptime(p[0], TIME_FORMAT) - target).total_seconds()))
+    state = _state(current[1] if base_name is None else archive.read(base_name))
+
+    lo, hi = sorted((base_time, ts))
+    months = {n for n in archive.names() if n.startswith("logs_") and lo[:7] <= n[len("logs_"):] <= hi[:7]}
+    frames = [archive.read(n) for n in sorted(months)] + [backend.read(sheet_name)]
+    logs = pd.concat([f for f in frames if not f.empty], ignore_index=True) if any(not f.empty for f in frames) else pd.DataFrame()
+    if not logs.empty:
+        times = logs['시간'].astype(str).str.strip()
+        window = logs[(times > lo) & (times <= hi)]
+        # 기준점 이후 시점이면 앞으로, 이전 시점이면 거꾸로 재생
+        sign = 1 if ts >= base_time else -1
+        for row in window.to_dict("records"):
+            for key, q in _moves(row):
+                state[key] = state.get(key, 0) + sign * q
+    result = pd.DataFrame([(*k, q) for k, q in state.items() if q], columns=['이름', '대여여부', '대여자', '수량'])
+    return result.sort_values(['이름', '대여여부', '대여자'], kind="stable").reset_index(drop=True)
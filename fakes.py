@@ -0,0 +1,274 @@
+import random
+import re
+import threading
+import time
+import pandas as pd
+
+
+# 구글 시트 API 오류 흉내 (gspread APIError처럼 response.status_code 제공)
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeAPIError(Exception):
+    def __init__(self, status_code, message=""):
+        self.response = FakeResponse(status_code)
+        super().__init__(f"{status_code} {message}".strip())
+
+
+class WorksheetNotFound(Exception):
+    pass
+
+
+# GSheetsConnection 대역 (메모리에 시트를 문자열 셀로 보관)
+# - read/update/create: GSheetsConnection과 같은 전체 읽기/쓰기
+# - spreadsheet: gspread Spreadsheet/Worksheet 대역 (행 단위 API: row_values, col_values, batch_get,
+#   batch_update, update, append_rows, delete_rows, del_worksheet)
+# - latency: 요청마다 지연(초), error_rate: 무작위 429 비율
+# - quota_per_min: 최근 60초 요청 수가 이를 넘으면 429 (실제 분당 할당량 흉내)
+# - calls: 요청 종류별 횟수, cells/bytes: 주고받은 셀 수와 문자열 바이트 수 (부하 측정용)
+class FakeGSheetsConnection:
+    # 마지막으로 만든 연결 (벤치마크에서 앱 내부 연결의 호출 수를 읽을 때 사용)
+    latest = None
+
+    def __init__(self, sheets=None, latency=0.0, error_rate=0.0, quota_per_min=None, seed=None):
+        self.sheets = {k: _as_cells(v) for k, v in (sheets or {}).items()}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.quota_per_min = quota_per_min
+        self.calls = {"read": 0, "update": 0, "create": 0, "rejected": 0}
+        self.cells = 0
+        self.bytes = 0
+        self.spreadsheet = FakeSpreadsheet(self)
+        self._recent = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        FakeGSheetsConnection.latest = self
+
+    # 성공한 요청 수 (거절된 429 제외)
+    def requests(self):
+        return sum(n for kind, n in self.calls.items() if kind != "rejected")
+
+    def _transfer(self, values):
+        if isinstance(values, pd.DataFrame):
+            self.cells += values.size + len(values.columns)
+            self.bytes += int(sum(values[c].str.len().sum() for c in values.columns)) + sum(len(str(c)) for c in values.columns)
+        else:
+            for row in values:
+                self.cells += len(row)
+                self.bytes += sum(len(str(v)) for v in row)
+
+    def _request(self, kind):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            now = time.monotonic()
+            self._recent = [t for t in self._recent if now - t < 60]
+            over_quota = self.quota_per_min is not None and len(self._recent) >= self.quota_per_min
+            if over_quota or self._random.random() < self.error_rate:
+                self.calls["rejected"] += 1
+                raise FakeAPIError(429, "RATE_LIMIT_EXCEEDED")
+            self._recent.append(now)
+            self.calls[kind] = self.calls.get(kind, 0) + 1
+
+    def read(self, worksheet=None, ttl=None, **kwargs):
+        self._request("read")
+        with self._lock:
+            if worksheet not in self.sheets:
+                raise WorksheetNotFound(worksheet)
+            df = self.sheets[worksheet].copy()
+            self._transfer(df)
+            return df
+
+    def update(self, worksheet=None, data=None, **kwargs):
+        self._request("update")
+        with self._lock:
+            if worksheet not in self.sheets:
+                raise WorksheetNotFound(worksheet)
+            self.sheets[worksheet] = _as_cells(pd.DataFrame(data))
+            self._transfer(self.sheets[worksheet])
+
+    def create(self, worksheet=None, data=None, **kwargs):
+        self._request("create")
+        with self._lock:
+            self.sheets[worksheet] = _as_cells(pd.DataFrame(data))
+            self._transfer(self.sheets[worksheet])
+
+
+class FakeSpreadsheet:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def worksheet(self, title):
+        self.conn._request("worksheet")
+        with self.conn._lock:
+            if title not in self.conn.sheets:
+                raise WorksheetNotFound(title)
+        return FakeWorksheet(self.conn, title)
+
+    def del_worksheet(self, ws):
+        self.conn._request("del_worksheet")
+        with self.conn._lock:
+            self.conn.sheets.pop(ws.title, None)
+
+
+# gspread Worksheet 대역: 1행은 머리글, 2행부터 데이터 (행/열 번호는 1부터)
+class FakeWorksheet:
+    def __init__(self, conn, title):
+        self.conn = conn
+        self.title = title
+
+    def _frame(self):
+        if self.title not in self.conn.sheets:
+            raise WorksheetNotFound(self.title)
+        return self.conn.sheets[self.title]
+
+    def _row(self, df, row):
+        if row == 1:
+            return [str(c) for c in df.columns]
+        if 2 <= row <= len(df) + 1:
+            return _trim(df.iloc[row - 2].tolist())
+        return []
+
+    def row_values(self, row, **kwargs):
+        self.conn._request("row_values")
+        with self.conn._lock:
+            values = self._row(self._frame(), row)
+            self.conn._transfer([values])
+            return values
+
+    def col_values(self, col, **kwargs):
+        self.conn._request("col_values")
+        with self.conn._lock:
+            df = self._frame()
+            values = _trim([str(df.columns[col - 1])] + df.iloc[:, col - 1].tolist()) if col <= len(df.columns) else []
+            self.conn._transfer([[v] for v in values])
+            return values
+
+    def batch_get(self, ranges, **kwargs):
+        self.conn._request("batch_get")
+        with self.conn._lock:
+            df = self._frame()
+            result = []
+            for rng in ranges:
+                start, end = (int(r) for r in rng.split(":"))
+                rows = [self._row(df, r) for r in range(start, end + 1)]
+                rows = [r for r in rows if r]
+                self.conn._transfer(rows)
+                result.append(rows)
+            return result
+
+    def batch_update(self, data, **kwargs):
+        self.conn._request("batch_update")
+        with self.conn._lock:
+            for item in data:
+                self._set(item["range"], item["values"])
+
+    def update(self, values=None, range_name="A1", **kwargs):
+        self.conn._request("update")
+        with self.conn._lock:
+            self._set(range_name, values)
+
+    def _set(self, a1, values):
+        df = self._frame()
+        row, col = _parse_a1(a1)
+        self.conn._transfer(values)
+        for i, vals in enumerate(values):
+            r = row + i
+            width = col - 1 + len(vals)
+            if width > len(df.columns):
+                for n in range(len(df.columns), width):
+                    df[f"_col{n + 1}"] = ""
+            if r == 1:
+                names = list(df.columns)
+                names[col - 1:width] = [str(v) for v in vals]
+                df.columns = names
+            elif 2 <= r <= len(df) + 1:
+                for j, v in enumerate(vals):
+                    df.iat[r - 2, col - 1 + j] = _str(v)
+        self.conn.sheets[self.title] = df
+
+    def append_rows(self, values, **kwargs):
+        self.conn._request("append_rows")
+        with self.conn._lock:
+            df = self._frame()
+            width = len(df.columns)
+            rows = [[_str(v) for v in row][:width] + [""] * (width - len(row)) for row in values]
+            self.conn._transfer(rows)
+            self.conn.sheets[self.title] = pd.concat([df, pd.DataFrame(rows, columns=df.columns)], ignore_index=True)
+
+    def delete_rows(self, start, end=None, **kwargs):
+        self.conn._request("delete_rows")
+        with self.conn._lock:
+            df = self._frame()
+            end = start if end is None else end
+            keep = [i for i in range(len(df)) if not (start - 2 <= i <= end - 2)]
+            self.conn.sheets[self.title] = df.iloc[keep].reset_index(drop=True)
+
+
+def _str(v):
+    if v is None or (isinstance(v, float) and v != v):
+        return ""
+    return str(v)
+
+
+def _trim(values):
+    values = [_str(v) for v in values]
+    while values and values[-1] == "":
+        values.pop()
+    return values
+
+
+def _parse_a1(a1):
+    letters, digits = re.fullmatch(r"([A-Z]+)(\d+)", a1.split(":")[0]).groups()
+    col = 0
+    for ch in letters:
+        col = col * 26 + ord(ch) - 64
+    return int(digits), col
+
+
+# 시트처럼 모든 셀을 문자열로 보관 (빈 셀은 "")
+def _as_cells(df):
+    df = df.copy()
+    for col in df.columns:
+        df[col] = [_str(v) for v in df[col].tolist()]
+    return df.astype(object)
+
+
+# 벤치마크/부하 시험용 시트 생성 (재고 rows행, 로그 log_rows행, 승인된 시험 계정 1개)
+BENCH_USER = ("bench", "bench1234")
+
+
+def make_sheets(rows=1000, log_rows=1000, seed=0):
+    import hashlib
+    from logs import LOG_FIELDS
+    from schema import FIELD_NAMES, STATUSES
+    rng = random.Random(seed)
+    kinds = ["대여", "현장출고", "반납", "상태변경", "등록"]
+    statuses = [rng.choice(STATUSES[:3]) for _ in range(rows)]
+    inventory = pd.DataFrame({
+        'ID': [f"id-{i}" for i in range(rows)],
+        '타입': [f"타입{rng.randint(0, 29)}" for _ in range(rows)],
+        '이름': [f"장비 {i}" for i in range(rows)],
+        '수량': [rng.randint(1, 20) for _ in range(rows)],
+        '브랜드': [f"브랜드{rng.randint(0, 79)}" for _ in range(rows)],
+        '대여여부': statuses,
+        '대여자': ["" if s == "재고" else f"업체{rng.randint(0, 49)}" for s in statuses],
+        '대여일': ["" if s == "재고" else "2024-03-01" for s in statuses],
+    }).reindex(columns=FIELD_NAMES, fill_value="")
+    start = time.mktime((2024, 1, 1, 9, 0, 0, 0, 0, -1))
+    logs = pd.DataFrame({
+        '시간': [time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start + i * 60)) for i in range(log_rows)],
+        '작성자': [f"user{rng.randint(0, 9)}" for _ in range(log_rows)],
+        '종류': [rng.choice(kinds) for _ in range(log_rows)],
+        '장비이름': [f"장비 {rng.randint(0, max(rows - 1, 0))}" for _ in range(log_rows)],
+        '수량': [rng.randint(1, 5) for _ in range(log_rows)],
+        '대상': [f"업체{rng.randint(0, 49)}" for _ in range(log_rows)],
+    }).reindex(columns=LOG_FIELDS, fill_value="")
+    name, password = BENCH_USER
+    users = pd.DataFrame([{
+        'username': name, 'birth': "1990-01-01", 'password': hashlib.sha256(password.encode()).hexdigest(),
+        'role': "사용자", 'approved': "TRUE", 'created_at': "2024-01-01",
+    }])
+    return {"Sheet1": inventory, "Logs": logs, "Users": users}
@@ -0,0 +1,164 @@
+import threading
+import time
+import pandas as pd
+from storage import Delta, StorageBackend
+
+
+# 주고받은 표의 크기 (바이트, 문자열 포함 실제 메모리 기준 추정치)
+def payload_bytes(obj):
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=False, deep=True).sum())
+    if isinstance(obj, tuple):
+        return sum(payload_bytes(o) for o in obj)
+    # 변경분: 추가 행 + 수정된 셀 값 + 삭제 키
+    if isinstance(obj, Delta):
+        updated = sum(len(str(v)) for cols in obj.updated.values() for v in cols.values())
+        return payload_bytes(obj.inserted) + updated + sum(len(str(k)) for k in obj.deleted)
+    return 0
+
+
+# 한 번의 실행(또는 누적)에서 저장소 작업별 호출 수/바이트/시간
+class RunStats:
+    def __init__(self, label=""):
+        self.label = label
+        self.started = time.perf_counter()
+        self.wall = None
+        self.ops = {}
+
+    def add(self, op, seconds, nbytes):
+        calls, total_bytes, total_seconds = self.ops.get(op, (0, 0, 0.0))
+        self.ops[op] = (calls + 1, total_bytes + nbytes, total_seconds + seconds)
+
+    def finish(self):
+        self.wall = time.perf_counter() - self.started
+        return self
+
+    def copy(self):
+        other = RunStats(self.label)
+        other.started, other.wall, other.ops = self.started, self.wall, dict(self.ops)
+        return other
+
+    # 두 시점의 누적값 차이 (벤치마크에서 작업 하나의 비용 계산용)
+    def since(self, before):
+        diff = RunStats(self.label)
+        for op, (calls, nbytes, seconds) in self.ops.items():
+            c0, b0, s0 = before.ops.get(op, (0, 0, 0.0))
+            if calls - c0:
+                diff.ops[op] = (calls - c0, nbytes - b0, seconds - s0)
+        return diff
+
+    def totals(self):
+        calls = sum(v[0] for v in self.ops.values())
+        nbytes = sum(v[1] for v in self.ops.values())
+        seconds = sum(v[2] for v in self.ops.values())
+        return calls, nbytes, seconds
+
+    def as_frame(self):
+        rows = [{'작업': op, '호출 수': c, 'KB': round(b / 1024, 1), 'ms': round(s * 1000, 1)}
+                for op, (c, b, s) in sorted(self.ops.items())]
+        return pd.DataFrame(rows, columns=['작업', '호출 수', 'KB', 'ms'])
+
+
+# 프로세스 전역 지표: 전체 누적(total)과 스레드별 현재 실행(Streamlit 세션 실행 단위)
+class Metrics:
+    def __init__(self):
+        self.total = RunStats("total")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def start(self, label=""):
+        run = RunStats(label)
+        self._local.run = run
+        return run
+
+    def current(self):
+        return getattr(self._local, "run", None)
+
+    def stop(self):
+        run = self.current()
+        self._local.run = None
+        return run.finish() if run is not None else None
+
+    def record(self, op, seconds, nbytes):
+        with self._lock:
+            self.total.add(op, seconds, nbytes)
+            run = self.current()
+            if run is not None:
+                run.add(op, seconds, nbytes)
+
+    def snapshot(self):
+        with self._lock:
+            return self.total.copy()
+
+    def reset(self):
+        with self._lock:
+            self.total = RunStats("total")
+
+
+METRICS = Metrics()
+
+
+# 저장소 호출을 측정하는 래퍼 (R2D2_METRICS=1일 때만 사용)
+class InstrumentedBackend(StorageBackend):
+    def __init__(self, backend, metrics=METRICS):
+        self.backend = backend
+        self.metrics = metrics
+
+    def _timed(self, op, fn, *args, sent=None, **kwargs):
+        started = time.perf_counter()
+        result = None
+        try:
+            result = fn(*args, **kwargs)
+            return result
+        finally:
+            self.metrics.record(op, time.perf_counter() - started, payload_bytes(sent) + payload_bytes(result))
+
+    def read(self, sheet_name):
+        return self._timed("read", self.backend.read, sheet_name)
+
+    def write(self, sheet_name, df):
+        return self._timed("write", self.backend.write, sheet_name, df, sent=df)
+
+    def version(self, sheet_name):
+        return self.backend.version(sheet_name)
+
+    def find(self, sheet_name, **equals):
+        return self._timed("find", self.backend.find, sheet_name, **equals)
+
+    def append(self, sheet_name, rows):
+        return self._timed("append", self.backend.append, sheet_name, rows, sent=rows)
+
+    def upsert(self, sheet_name, rows, key):
+        return self._timed("upsert", self.backend.upsert, sheet_name, rows, key, sent=rows)
+
+    def delete(self, sheet_name, ids, key):
+        return self._timed("delete", self.backend.delete, sheet_name, ids, key)
+
+    def delete_before(self, sheet_name, column, value):
+        return self._timed("delete_before", self.backend.delete_before, sheet_name, column, value)
+
+    def drop(self, sheet_name):
+        return self._timed("drop", self.backend.drop, sheet_name)
+
+    def apply_delta(self, sheet_name, delta, key, canon=None):
+        return self._timed("apply_delta", self.backend.apply_delta, sheet_name, delta, key, canon, sent=delta)
+
+    # query_logs, iter_rows 등 저장소 고유 기능도 이름별로 측정
+    def __getattr__(self, name):
+        attr = getattr(self.backend, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+        if name == "iter_rows":
+            return lambda *args, **kwargs: self._iter(attr, *args, **kwargs)
+        return lambda *args, **kwargs: self._timed(name, attr, *args, **kwargs)
+
+    def _iter(self, fn, *args, **kwargs):
+        chunks = fn(*args, **kwargs)
+        while True:
+            started = time.perf_counter()
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                return
+            self.metrics.record("iter_rows", time.perf_counter() - started, payload_bytes(chunk))
+            yield chunk
@@ -0,0 +1,307 @@
+import uuid
+import pandas as pd
+from schema import to_storage
+from storage import Delta
+
+
+# 세션별 재고 인덱스
+# - by_id: ID -> 행 라벨
+# - by_key: (이름, 대여여부) -> 행 라벨 목록 (반납 시 재고 행 조회 등)
+# - by_status: 대여여부 -> 행 라벨 (목록 화면용)
+# - totals: 대여여부별 수량 합계 (상단 요약 지표)
+# 대여/출고/반납/상태 변경은 바뀐 행만 인덱스에서 빼고 다시 넣어 갱신합니다.
+# 행 라벨은 삭제 후에도 다시 매기지 않으므로(reset_index 없음) 인덱스가 유지됩니다.
+# 바뀐 행은 따로 기록해 두었다가 changes()로 저장할 변경분만 만듭니다.
+# 새 행 추가/행 삭제는 모아 두었다가 df를 읽을 때 한 번에 반영합니다 (작업마다 전체 표를 복사하지 않음).
+class Inventory:
+    def __init__(self, df, source=None):
+        self.df = df
+        # 이 인덱스를 만든 공유 캐시 스냅샷 (바뀌면 다시 생성)
+        self.source = source
+        self.rebuild()
+
+    @property
+    def df(self):
+        if self._pending or self._dropped:
+            self._flush()
+        return self._df
+
+    @df.setter
+    def df(self, df):
+        self._df = df
+        self._pending = {}
+        self._dropped = set()
+
+    def rebuild(self):
+        df = self.df
+        self.by_id = dict(zip(df['ID'].astype(str), df.index))
+        self.by_key = {}
+        self.by_status = {}
+        if not df.empty:
+            names = df['이름'].astype(str)
+            statuses = df['대여여부'].astype(str)
+            for (name, status), labels in df.groupby([names, statuses], sort=False).groups.items():
+                self.by_key[(name, status)] = list(labels)
+                self.by_status.setdefault(status, {}).update(dict.fromkeys(labels))
+            self.totals = df['수량'].groupby(statuses, sort=False).sum().astype(int).to_dict()
+        else:
+            self.totals = {}
+        self._next_label = int(df.index.max()) + 1 if not df.empty else 0
+        self._mark_clean()
+
+    def _mark_clean(self):
+        self._base_ids = dict(self.by_id)
+        self._dirty = set()
+        self._removed = set()
+        ids = self.df['ID'].astype(str).str.strip()
+        # ID가 비었거나 중복된 행이 있으면 행 단위 저장이 불가능 (전체 저장으로 대체)
+        self.keyed = bool(ids.ne("").all() and ids.is_unique)
+
+    # --- 행 접근 (반영 대기 중인 새 행 포함, 표 전체를 합치지 않음) ---
+    def _row(self, label):
+        if label in self._pending:
+            return pd.Series(self._pending[label], name=label).reindex(self._df.columns)
+        return self._df.loc[label]
+
+    def _get(self, label, col):
+        if label in self._pending:
+            return self._pending[label].get(col)
+        return self._df.at[label, col]
+
+    def _set(self, label, col, val):
+        if label in self._pending:
+            self._pending[label][col] = val
+        else:
+            self._df.at[label, col] = val
+
+    # --- 인덱스 갱신 ---
+    def _unindex(self, label):
+        row = self._row(label)
+        name, status = str(row['이름']), str(row['대여여부'])
+        self.by_id.pop(str(row['ID']), None)
+        labels = self.by_key.get((name, status), [])
+        if label in labels:
+            labels.remove(label)
+            if not labels:
+                del self.by_key[(name, status)]
+        self.by_status.get(status, {}).pop(label, None)
+        self.totals[status] = self.totals.get(status, 0) - int(row['수량'])
+
+    def _index(self, label):
+        row = self._row(label)
+        name, status = str(row['이름']), str(row['대여여부'])
+        self.by_id[str(row['ID'])] = label
+        labels = self.by_key.setdefault((name, status), [])
+        labels.append(label)
+        labels.sort()
+        self.by_status.setdefault(status, {})[label] = None
+        self.totals[status] = self.totals.get(status, 0) + int(row['수량'])
+
+    def _append(self, row):
+        label = self._next_label
+        self._next_label += 1
+        self._pending[label] = dict(row)
+        self._index(label)
+        self._dirty.add(label)
+        return label
+
+    # 모아 둔 삭제/새 행을 한 번에 반영 (열 타입은 기존 표에 맞춤)
+    def _flush(self):
+        df = self._df
+        if self._dropped:
+            df = df.drop(list(self._dropped))
+            self._dropped = set()
+        if self._pending:
+            new = pd.DataFrame(list(self._pending.values()), index=list(self._pending)).reindex(columns=df.columns)
+            self._pending = {}
+            for col in df.columns:
+                dtype = df[col].dtype
+                if isinstance(dtype, pd.CategoricalDtype):
+                    # 새 범주 값(새 타입/브랜드 등)은 범주 목록에 추가해 범주형 유지
+                    values = new[col].fillna("").astype(str)
+                    missing = set(values) - set(dtype.categories)
+                    if missing:
+                        df[col] = df[col].cat.add_categories(sorted(missing))
+                    new[col] = pd.Categorical(values, categories=df[col].cat.categories)
+                elif pd.api.types.is_datetime64_any_dtype(dtype):
+                    new[col] = pd.to_datetime(new[col], errors='coerce')
+                elif pd.api.types.is_integer_dtype(dtype):
+                    new[col] = pd.to_numeric(new[col], errors='coerce').fillna(0).astype(dtype)
+                else:
+                    new[col] = new[col].fillna("")
+            df = pd.concat([df, new])
+        self._df = df
+
+    def _update(self, label, **values):
+        self._unindex(label)
+        for col, val in values.items():
+            self._set(label, col, val)
+        self._index(label)
+        self._dirty.add(label)
+
+    # --- 조회 ---
+    def total(self, status):
+        return int(self.totals.get(status, 0))
+
+    def rows(self, *statuses):
+        labels = sorted(l for s in statuses for l in self.by_status.get(s, {}))
+        return self.df.loc[labels]
+
+    def get(self, item_id):
+        label = self.by_id.get(str(item_id))
+        return None if label is None else self._row(label)
+
+    def find(self, name, status):
+        labels = self.by_key.get((str(name), str(status)))
+        return labels[0] if labels else None
+
+    # --- 변경 작업 ---
+    def add(self, row):
+        row = dict(row)
+        row.setdefault('ID', str(uuid.uuid4()))
+        return self._append(row)
+
+    def rent(self, label, qty, target, rent_date, return_date):
+        item = self._row(label).copy()
+        self._update(label, 수량=int(item['수량']) - int(qty))
+        new_row = item.to_dict()
+        new_row.update({
+            'ID': str(uuid.uuid4()), '수량': int(qty), '대여여부': '대여 중',
+            '대여자': target, '대여일': rent_date, '반납예정일': return_date
+        })
+        self._append(new_row)
+        return item
+
+    def dispatch(self, label, qty, site, dispatch_date):
+        item = self._row(label).copy()
+        self._update(label, 수량=int(item['수량']) - int(qty))
+        new_row = item.to_dict()
+        new_row.update({
+            'ID': str(uuid.uuid4()), '수량': int(qty), '대여여부': '현장 출고',
+            '대여자': site, '대여일': dispatch_date
+        })
+        self._append(new_row)
+        return item
+
+    # 같은 이름의 재고 행이 있으면 수량을 합치고, 없으면 해당 행을 재고로 되돌림
+    def return_item(self, label):
+        item = self._row(label).copy()
+        stock = self.find(item['이름'], '재고')
+        if stock is not None and stock != label:
+            self._update(stock, 수량=int(self._get(stock, '수량')) + int(item['수량']))
+            self.remove(label)
+        else:
+            self._update(label, 대여여부='재고', 대여자='')
+        return item
+
+    def set_status(self, label, status):
+        item = self._row(label).copy()
+        self._update(label, 대여여부=status)
+        return item
+
+    def request_delete(self, name):
+        labels = [l for s in list(self.by_status) for l in self.by_key.get((str(name), s), [])]
+        for label in labels:
+            self._set(label, '삭제요청', 'Y')
+        self._dirty.update(labels)
+        return labels
+
+    def clear_delete_request(self, label):
+        self._set(label, '삭제요청', '')
+        self._dirty.add(label)
+
+    def remove(self, label):
+        item = self._row(label).copy()
+        self._removed.add(str(item['ID']))
+        self._dirty.discard(label)
+        self._unindex(label)
+        if label in self._pending:
+            del self._pending[label]
+        else:
+            self._dropped.add(label)
+        return item
+
+    # 장바구니 일괄 처리: 전체를 먼저 검증한 뒤 순서대로 적용
+    # entries: {'kind': '대여'|'현장출고'|'반납', 'id', 'qty', 'target', 'return_date'}
+    # 처리된 (항목, 원래 행) 목록을 반환하며, 하나라도 불가능하면 아무것도 바꾸지 않고 ValueError
+    def apply_cart(self, entries, today):
+        need, returning = {}, set()
+        for e in entries:
+            label = self.by_id.get(str(e['id']))
+            if label is None:
+                raise ValueError(f"'{e.get('name', e['id'])}' 항목을 찾을 수 없습니다.")
+            status = str(self._get(label, '대여여부'))
+            if e['kind'] == '반납':
+                if status not in ('대여 중', '현장 출고') or label in returning:
+                    raise ValueError(f"'{e.get('name', e['id'])}' 항목은 반납할 수 없습니다.")
+                returning.add(label)
+            else:
+                need[label] = need.get(label, 0) + int(e['qty'])
+                if status != '재고' or need[label] > int(self._get(label, '수량')):
+                    raise ValueError(f"'{e.get('name', e['id'])}' 재고가 부족합니다.")
+        done = []
+        for e in entries:
+            label = self.by_id[str(e['id'])]
+            if e['kind'] == '대여':
+                item = self.rent(label, int(e['qty']), e['target'], today, e.get('return_date', ''))
+            elif e['kind'] == '현장출고':
+                item = self.dispatch(label, int(e['qty']), e['target'], today)
+            else:
+                item = self.return_item(label)
+            done.append((e, item))
+        return done
+
+    # --- 저장 ---
+    # 마지막 저장(또는 로드) 이후 바뀐 행만 담은 변경분. 행 단위 저장이 불가능하면 None
+    def changes(self):
+        if not self.keyed or self.source is None:
+            return None
+        labels = sorted(l for l in self._dirty if l in self.df.index)
+        current = to_storage(self.df.loc[labels], "Sheet1")
+        ids = current['ID'].astype(str).str.strip()
+        if ids.eq("").any():
+            return None
+        # 바뀐 행 수만큼만 조회 (전체 ID 목록으로 isin 하지 않음)
+        known = pd.Series([i in self._base_ids for i in ids], index=ids.index, dtype=bool)
+        base_labels = [self._base_ids[i] for i in ids[known]]
+        base_labels += [self._base_ids[i] for i in self._removed if i in self._base_ids]
+        base = to_storage(self.source.loc[base_labels], "Sheet1")
+        base_by_id = base.set_index(base['ID'].astype(str).str.strip())
+        updated = {}
+        for item_id, row in zip(ids[known], current[known].to_dict("records")):
+            old = base_by_id.loc[item_id]
+            cols = {c: v for c, v in row.items() if str(v) != str(old.get(c, ""))}
+            if cols:
+                updated[item_id] = cols
+        deleted = [i for i in self._removed if i in self._base_ids]
+        touched = base_by_id.index.isin(list(updated) + deleted)
+        return Delta(inserted=current[~known.to_numpy()], updated=updated, deleted=deleted,
+                     base=base[touched])
+
+    # 저장이 끝난 상태를 새 기준 스냅샷으로 삼음
+    def commit(self, snapshot):
+        self.source = snapshot
+        self._mark_clean()
+
+
+# 편집기 결과와 원본을 ID 기준으로 비교해 변경분 생성. ID가 비었거나 중복이면 None
+def diff_frames(before, after, key='ID'):
+    before = to_storage(before, "Sheet1")
+    after = to_storage(after, "Sheet1")
+    b_keys = before[key].astype(str).str.strip()
+    a_keys = after[key].astype(str).str.strip()
+    if b_keys.eq("").any() or a_keys.eq("").any() or not b_keys.is_unique or not a_keys.is_unique:
+        return None
+    b = before.set_index(b_keys)
+    a = after.set_index(a_keys)
+    common = a.index.intersection(b.index)
+    cols = [c for c in a.columns if c in b.columns]
+    changed = a.loc[common, cols].astype(str) != b.loc[common, cols].astype(str)
+    updated = {}
+    for k in changed.index[changed.any(axis=1)]:
+        row = changed.loc[k]
+        updated[k] = {c: a.at[k, c] for c in row.index[row.to_numpy()]}
+    deleted = list(b.index.difference(a.index))
+    inserted = a[~a.index.isin(b.index)].reset_index(drop=True)
+    base = b.loc[list(updated) + deleted].reset_index(drop=True)
+    return Delta(inserted=inserted, updated=updated, deleted=deleted, base=base)
@@ -0,0 +1,221 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 활동 로그 필드 정의
+LOG_FIELDS = ['시간', '작성자', '종류', '장비이름', '수량', '대상', '날짜', '반납예정일', '이전상태']
+
+# 살아 있는 LogWriter 목록 (flush_all용)
+_WRITERS = weakref.WeakSet()
+
+
+# 1. 로그 쓰기 지연(write-behind) 큐
+# - submit()은 로컬 스풀 파일에 먼저 기록(fsync)한 뒤 즉시 반환합니다.
+# - 백그라운드 스레드가 batch_size 건 또는 flush_interval 초마다 묶어서
+#   저장소에 추가(append)만 수행하므로 로그 크기와 무관하게 비용이 일정합니다.
+# - 할당량/일시 오류 재시도는 저장소 스케줄러가 요청 단위로 처리하므로 여기서는 다시 재시도하지 않고,
+#   실패한 묶음은 스풀에 남겨 두었다가 다음 주기(또는 재시작 후)에 다시 보냅니다.
+class LogWriter:
+    def __init__(self, backend, spool_path, sheet_name="Logs", batch_size=50,
+                 flush_interval=2.0, on_flush=None):
+        self.backend = backend
+        self.spool_path = spool_path
+        self.sheet_name = sheet_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self._cond = threading.Condition()
+        self._queue = self._load_spool()
+        self._flush_requested = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        _WRITERS.add(self)
+        atexit.register(self.close)
+
+    def _load_spool(self):
+        rows = []
+        if os.path.exists(self.spool_path):
+            with open(self.spool_path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        rows.append(json.loads(line))
+                    except ValueError:
+                        # 기록 도중 중단된 마지막 줄은 버림
+                        logger.warning("손상된 로그 스풀 항목을 건너뜁니다: %r", line[:80])
+        return rows
+
+    def _rewrite_spool(self):
+        tmp = self.spool_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for row in self._queue:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.spool_path)
+
+    def submit(self, rows):
+        if not rows:
+            return
+        with self._cond:
+            with open(self.spool_path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._queue.extend(rows)
+            self._cond.notify_all()
+
+    def pending(self):
+        with self._cond:
+            return list(self._queue)
+
+    # 대기 중인 로그를 즉시 전송하고 큐가 빌 때까지(최대 timeout초) 기다림
+    def flush(self, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._queue and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return not self._queue
+
+    def close(self, timeout=5.0):
+        if not self._closed:
+            self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and not self._queue:
+                    self._cond.wait()
+                # 첫 항목이 들어온 뒤 flush_interval 동안 더 모아서 한 번에 전송
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closed and len(self._queue) < self.batch_size and not self._flush_requested:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+                batch = self._queue[:self.batch_size]
+            if self._send(batch):
+                with self._cond:
+                    del self._queue[:len(batch)]
+                    if not self._queue:
+                        self._flush_requested = False
+                    try:
+                        self._rewrite_spool()
+                    except OSError:
+                        logger.exception("로그 스풀 갱신 실패")
+                    self._cond.notify_all()
+                if self.on_flush:
+                    self.on_flush()
+            else:
+                with self._cond:
+                    # 다음 주기까지 대기 (flush 요청자도 깨워서 타임아웃 판단)
+                    self._flush_requested = False
+                    self._cond.notify_all()
+                    self._cond.wait(self.flush_interval)
+
+    def _send(self, batch):
+        frame = pd.DataFrame(batch).reindex(columns=_columns(batch))
+        try:
+            self.backend.append(self.sheet_name, frame)
+            return True
+        except Exception:
+            logger.error("로그 %d건 전송 실패, 스풀에 보관하고 다음 주기에 재시도합니다", len(batch), exc_info=True)
+            return False
+
+
+# 모든 LogWriter의 대기 로그를 전송 (벤치마크에서 작업별 비용을 분리할 때 사용)
+def flush_all(timeout=10.0):
+    return all([w.flush(timeout) for w in list(_WRITERS)])
+
+
+def _columns(rows):
+    cols = list(LOG_FIELDS)
+    for row in rows:
+        for col in row:
+            if col not in cols:
+                cols.append(col)
+    return cols
+
+
+# 2. 활동 로그 조회 (기간/종류/작성자/장비이름 필터, 최신순 페이지)
+def filter_logs(df, start=None, end=None, kinds=None, authors=None, item=""):
+    if df.empty:
+        return df
+    mask = pd.Series(True, index=df.index)
+    if start is not None or end is not None:
+        day = df['시간'].astype(str).str[:10]
+        if start is not None:
+            mask &= day >= str(start)
+        if end is not None:
+            mask &= day <= str(end)
+    if kinds:
+        mask &= df['종류'].isin(kinds)
+    if authors:
+        mask &= df['작성자'].isin(authors)
+    if item:
+        mask &= df['장비이름'].astype(str).str.contains(item, case=False, regex=False)
+    return df[mask]
+
+
+# 시간순으로 정렬해 둔 로그 인덱스 (구글 시트처럼 서버 측 조회가 없는 저장소용)
+# 기간은 이진 탐색으로 자르고, 종류/작성자는 값별 위치 목록으로 좁히므로
+# 필터가 없을 때 한 페이지 조회 비용은 페이지 크기에 비례합니다.
+class LogIndex:
+    def __init__(self, df):
+        if df.empty:
+            df = pd.DataFrame(columns=LOG_FIELDS)
+        days = df['시간'].astype(str).str[:10] if '시간' in df.columns else pd.Series("", index=df.index)
+        order = np.argsort(df['시간'].astype(str).to_numpy(), kind="stable") if '시간' in df.columns else np.arange(len(df))
+        self.frame = df.iloc[order].reset_index(drop=True)
+        self.days = days.to_numpy()[order].astype(str)
+        self.positions = {}
+        for col in ('종류', '작성자'):
+            if col in self.frame.columns:
+                groups = self.frame.groupby(self.frame[col].astype(str), sort=True).indices
+                self.positions[col] = {k: np.asarray(v) for k, v in groups.items()}
+
+    def values(self, col):
+        return sorted(self.positions.get(col, {}))
+
+    def query(self, start=None, end=None, kinds=None, authors=None, item="", offset=0, limit=50):
+        lo = 0 if start is None else int(np.searchsorted(self.days, str(start), side="left"))
+        hi = len(self.frame) if end is None else int(np.searchsorted(self.days, str(end), side="right"))
+        if not (kinds or authors or item):
+            total = max(hi - lo, 0)
+            stop = hi - offset
+            rows = np.arange(max(stop - limit, lo), max(stop, lo))[::-1]
+            return self.frame.iloc[rows], total
+        pos = np.arange(lo, hi)
+        for col, wanted in (('종류', kinds), ('작성자', authors)):
+            if wanted:
+                hits = [self.positions.get(col, {}).get(str(v)) for v in wanted]
+                hits = [h for h in hits if h is not None]
+                pos = np.intersect1d(pos, np.concatenate(hits) if hits else np.array([], dtype=int), assume_unique=False)
+        if item and len(pos):
+            names = self.frame['장비이름'].astype(str).to_numpy()[pos]
+            pos = pos[np.char.find(np.char.lower(names.astype(str)), item.lower()) >= 0]
+        total = len(pos)
+        rows = pos[::-1][offset:offset + limit]
+        return self.frame.iloc[rows], total
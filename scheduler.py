@@ -0,0 +1,142 @@
+import logging
+import random
+import threading
+import time
+from storage import StorageUnavailable
+
+logger = logging.getLogger(__name__)
+
+# 재시도할 HTTP 상태 (할당량 초과, 일시적인 서버 오류)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# 재시도할 연결/시간 초과 오류. gspread는 requests로, 인증 토큰 갱신은 google-auth로 통신하며
+# 두 라이브러리의 연결 오류는 파이썬 기본 ConnectionError/TimeoutError를 상속하지 않음
+TRANSIENT_ERRORS = (ConnectionError, TimeoutError)
+try:
+    import requests
+    TRANSIENT_ERRORS += (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+except ImportError:
+    pass
+try:
+    from google.auth.exceptions import TransportError
+    TRANSIENT_ERRORS += (TransportError,)
+except ImportError:
+    pass
+
+
+# 1. 토큰 버킷: 분당 rate_per_min 회, 최대 burst 회까지 연속 허용
+class TokenBucket:
+    def __init__(self, rate_per_min, burst=10):
+        self.rate = rate_per_min / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    # 토큰 n개를 얻을 때까지 대기. timeout 안에 얻지 못하면 False
+    def acquire(self, timeout=None, n=1):
+        n = min(float(n), self.capacity)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return True
+                wait = (n - self.tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    # 서버가 429를 돌려주면 남은 토큰을 비워 다른 세션도 함께 속도를 늦춤
+    def drain(self):
+        with self._lock:
+            self.tokens = min(self.tokens, 0.0)
+
+
+def _status(e):
+    response = getattr(e, "response", None)
+    code = getattr(response, "status_code", None) or getattr(e, "code", None) or getattr(e, "status_code", None)
+    try:
+        return int(code)
+    except (TypeError, ValueError):
+        return None
+
+
+def _retryable(e):
+    if isinstance(e, TRANSIENT_ERRORS):
+        return True
+    if _status(e) in RETRY_STATUS:
+        return True
+    text = str(e)
+    return "RATE_LIMIT_EXCEEDED" in text or "Quota exceeded" in text
+
+
+# 2. API 요청 스케줄러 (프로세스 전역)
+# - 저장소는 API 요청 하나마다 call()을 거치고, 요청이 실제로 쓰는 호출 수(cost)만큼 토큰을 씁니다.
+#   그래서 세션이 많아도 분당 할당량을 넘지 않고 대기열에서 기다립니다.
+# - 429/5xx/연결 오류는 그 요청만 지수 백오프(full jitter)로 재시도하고, 끝내 실패하면 StorageUnavailable.
+# - 같은 시트의 전체 쓰기가 대기 중에 쌓이면 가장 최신 내용 한 번만 씁니다 (coalesce).
+class Scheduler:
+    def __init__(self, rate_per_min=60, burst=10, max_retries=5, retry_base=0.5, retry_cap=16.0, max_wait=30.0):
+        self.bucket = TokenBucket(rate_per_min, burst)
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
+        self.max_wait = max_wait
+        self.stats = {"calls": 0, "retries": 0, "throttled": 0, "coalesced": 0, "failures": 0}
+        self._lock = threading.Lock()
+        self._write_locks = {}
+        self._latest = {}
+        self._done = {}
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def call(self, fn, *args, cost=1, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            if not self.bucket.acquire(timeout=0, n=cost):
+                self._count("throttled")
+                if not self.bucket.acquire(timeout=self.max_wait, n=cost):
+                    self._count("failures")
+                    raise StorageUnavailable("요청이 많아 저장소 할당량 대기 시간을 초과했습니다.")
+            self._count("calls")
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not _retryable(e):
+                    raise
+                if _status(e) == 429:
+                    self.bucket.drain()
+                if attempt == self.max_retries:
+                    self._count("failures")
+                    raise StorageUnavailable(f"저장소 요청이 계속 실패했습니다: {e}") from e
+                delay = random.uniform(0, min(self.retry_cap, self.retry_base * (2 ** attempt)))
+                logger.warning("저장소 요청 실패, %.1f초 후 재시도 (%d/%d): %s", delay, attempt + 1, self.max_retries, e)
+                self._count("retries")
+                time.sleep(delay)
+
+    # 같은 key의 쓰기는 순서대로 하나씩 실행. 기다리는 동안 더 새 값이 들어오면 그 값만 씀
+    # fn 안의 각 API 요청은 call()을 거쳐야 함 (여러 요청으로 된 쓰기를 통째로 재시도하지 않음)
+    # lock: 순서를 맞출 잠금. 저장소의 시트별 잠금을 넘기면 잠금 순서가 엇갈려 멈추는 일이 없음
+    def coalesce(self, key, fn, value, lock=None):
+        with self._lock:
+            generation = self._latest.get(key, (0, None))[0] + 1
+            self._latest[key] = (generation, value)
+            if lock is None:
+                lock = self._write_locks.setdefault(key, threading.Lock())
+        with lock:
+            with self._lock:
+                done_generation, result = self._done.get(key, (0, None))
+                if done_generation >= generation:
+                    # 뒤에 들어온 쓰기가 이미 이 내용을 덮어씀
+                    self.stats["coalesced"] += 1
+                    return result
+                latest_generation, latest = self._latest[key]
+            result = fn(latest)
+            with self._lock:
+                self._done[key] = (latest_generation, result)
+            return result
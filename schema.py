@@ -0,0 +1,106 @@
+import pandas as pd
+from logs import LOG_FIELDS
+
+# 장비 데이터 필드 및 상태 정의
+FIELD_NAMES = ['ID', '타입', '이름', '수량', '브랜드', '특이사항', '대여업체', '대여여부', '대여자', '대여일', '반납예정일', '출고비고', '사진', '삭제요청']
+STATUSES = ['재고', '대여 중', '현장 출고', '수리 중', '파손']
+
+# 시트별 열 타입 선언
+# - columns: 없으면 빈 값으로 생성할 열
+# - int: 정수(int32), category: 범주형(고정 범주 목록 또는 None=데이터에서 수집)
+# - date: 날짜(읽을 때 한 번만 변환, 저장할 때 YYYY-MM-DD 문자열로 복원)
+# - upper: 대문자로 통일 (승인 여부 0/FALSE/False 등)
+SCHEMAS = {
+    "Sheet1": {
+        "columns": FIELD_NAMES,
+        "int": ['수량'],
+        "category": {'대여여부': STATUSES, '타입': None, '브랜드': None},
+        "date": ['대여일', '반납예정일'],
+    },
+    "Logs": {"columns": LOG_FIELDS, "int": ['수량']},
+    "Users": {"upper": ['approved']},
+}
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def _strip(col):
+    if pd.api.types.is_string_dtype(col.dtype) and col.dtype != object:
+        return col.str.strip()
+    # 문자열/숫자가 섞인 열은 문자열만 다듬고 나머지 값은 유지
+    stripped = col.str.strip()
+    return stripped.where(stripped.notna(), col)
+
+
+def _parse_dates(raw):
+    parsed = pd.to_datetime(raw, format=DATE_FORMAT, errors='coerce')
+    bad = parsed.isna() & (raw != "")
+    if bad.any():
+        parsed[bad] = pd.to_datetime(raw[bad], format="mixed", errors='coerce')
+        # "미정" 등 날짜가 아닌 메모가 있으면 값을 잃지 않도록 문자열 그대로 둠
+        if (parsed.isna() & (raw != "")).any():
+            return raw
+    return parsed
+
+
+# 읽은 시트를 선언된 타입으로 정규화 (셀 단위 파이썬 호출 없이 열 단위로 처리)
+def normalize(df, sheet_name):
+    schema = SCHEMAS.get(sheet_name, {})
+    if df.empty and not schema.get("columns"):
+        return df
+    df = df.fillna("")
+    for col in df.columns:
+        if df[col].dtype == object or pd.api.types.is_string_dtype(df[col].dtype):
+            df[col] = _strip(df[col])
+    for col in schema.get("columns", []):
+        if col not in df.columns:
+            df[col] = ""
+    for col in schema.get("int", []):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('int32')
+    for col, categories in schema.get("category", {}).items():
+        if col in df.columns:
+            values = df[col].astype(str)
+            if categories is not None:
+                # 선언에 없는 상태 값이 있어도 데이터를 잃지 않도록 범주에 추가
+                categories = list(categories) + sorted(set(values.unique()) - set(categories))
+            df[col] = pd.Categorical(values, categories=categories)
+    for col in schema.get("date", []):
+        if col in df.columns:
+            df[col] = _parse_dates(df[col].astype(str))
+    for col in schema.get("upper", []):
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.upper()
+    return df
+
+
+# 저장 직전 변환: 날짜는 문자열로, 범주형은 일반 문자열로 되돌림
+def to_storage(df, sheet_name):
+    schema = SCHEMAS.get(sheet_name, {})
+    df = df.copy()
+    for col in schema.get("int", []):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+    for col in schema.get("category", {}):
+        if col in df.columns:
+            df[col] = df[col].astype(object).fillna("")
+    for col in schema.get("date", []):
+        if col in df.columns:
+            df[col] = _format_dates(df[col])
+    return df
+
+
+def _format_dates(col):
+    if pd.api.types.is_datetime64_any_dtype(col.dtype):
+        return col.dt.strftime(DATE_FORMAT).fillna("")
+    # 날짜와 문자열이 섞인 열 (새로 추가된 행, 날짜가 아닌 메모 등)
+    return col.map(lambda v: "" if v is None or v is pd.NaT or v != v else
+                   v.strftime(DATE_FORMAT) if hasattr(v, "strftime") else str(v))
+
+
+# 편집기(data_editor)용 사본: 타입/브랜드는 새 값을 자유롭게 입력할 수 있게 문자열로 표시
+def to_editable(df):
+    df = df.copy()
+    for col, categories in SCHEMAS["Sheet1"]["category"].items():
+        if categories is None and col in df.columns:
+            df[col] = df[col].astype(object)
+    return df
@@ -0,0 +1,116 @@
+import difflib
+import pandas as pd
+
+# 검색 대상 필드 및 한글 자모 분해 표
+SEARCH_FIELDS = ['이름', '타입', '브랜드', '특이사항']
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSUNG = ["", *"ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"]
+
+# 음절 11,172자를 자모/초성으로 바꾸는 변환표 (str.translate로 열 단위 처리)
+_JAMO = {}
+_INITIAL = {}
+for _code in range(0xAC00, 0xD7A4):
+    _cho, _rest = divmod(_code - 0xAC00, 588)
+    _jung, _jong = divmod(_rest, 28)
+    _JAMO[_code] = CHOSUNG[_cho] + JUNGSUNG[_jung] + JONGSUNG[_jong]
+    _INITIAL[_code] = CHOSUNG[_cho]
+FUZZY_CUTOFF = 0.6
+
+
+def to_jamo(text):
+    return str(text).lower().translate(_JAMO)
+
+
+def to_chosung(text):
+    return str(text).lower().translate(_INITIAL)
+
+
+def _is_chosung(query):
+    return bool(query) and all(ch in CHOSUNG or ch == " " for ch in query)
+
+
+# 세션별 재고 검색 인덱스
+# - 행마다 검색 필드를 합친 문자열의 자모/초성 형태를 미리 만들어 두고,
+#   검색은 열 단위 문자열 연산으로 처리합니다 (셀 단위 파이썬 반복 없음).
+# - 순위: 이름 앞부분 일치 > 이름 포함 > 다른 필드 포함. 일치 항목이 없으면 이름 유사(오타 허용)
+# - 재고 표에 새 행이 생기거나 행이 삭제되면 sync()가 해당 행만 반영합니다.
+#   대여여부는 바뀌는 값이므로 검색할 때 재고 표에서 바로 읽습니다.
+class SearchIndex:
+    def __init__(self, df, fields=SEARCH_FIELDS):
+        self.fields = [f for f in fields if f in df.columns]
+        # 이름 자모, 전체 필드 자모, 이름 초성, 전체 필드 초성 (공백 제거)
+        self.columns = ['name', 'text', 'name_initials', 'initials']
+        self.table = pd.DataFrame(columns=self.columns, dtype=object)
+        self.sync(df)
+
+    def sync(self, df):
+        stale = self.table.index.difference(df.index)
+        if len(stale):
+            self.table = self.table.drop(stale)
+        new = df.index.difference(self.table.index)
+        if len(new):
+            rows = df.loc[new, self.fields].astype(str)
+            name = rows['이름'].str.lower()
+            text = rows[self.fields[0]].str.cat([rows[f] for f in self.fields[1:]], sep=" ").str.lower()
+            added = pd.DataFrame({
+                'name': name.str.translate(_JAMO),
+                'text': text.str.translate(_JAMO),
+                'name_initials': name.str.translate(_INITIAL).str.replace(" ", "", regex=False),
+                'initials': text.str.translate(_INITIAL).str.replace(" ", "", regex=False),
+            }, index=new)
+            self.table = added if self.table.empty else pd.concat([self.table, added])
+        return self
+
+    # 검색어/패싯 조건에 맞는 행 라벨을 순위대로 반환 (within: 검색 범위로 제한할 행 라벨)
+    def search(self, df, query="", within=None, **facets):
+        self.sync(df)
+        labels = self.filter(df, df.index if within is None else within, **facets)
+        query = str(query).strip().lower()
+        if not query:
+            return list(labels)
+        table = self.table.loc[labels]
+        name = table['name']
+        if _is_chosung(query):
+            # 초성만 입력한 경우 (예: "ㅋㅁㄹ" -> 카메라)
+            q = query.replace(" ", "")
+            rank = pd.Series(3, index=labels)
+            rank[table['initials'].str.contains(q, regex=False)] = 2
+            rank[table['name_initials'].str.contains(q, regex=False)] = 1
+            rank[table['name_initials'].str.startswith(q)] = 0
+            return list(rank[rank < 3].sort_values(kind="stable").index)
+        # 자모 단위로 비교하므로 입력 중인 글자(예: "캄" -> 카메라)도 앞부분 일치로 찾음
+        q = to_jamo(query)
+        rank = pd.Series(3, index=labels)
+        rank[table['text'].str.contains(q, regex=False)] = 2
+        rank[name.str.contains(q, regex=False)] = 1
+        rank[name.str.startswith(q)] = 0
+        found = rank[rank < 3].sort_values(kind="stable")
+        if len(found) or len(q) < 3:
+            return list(found.index)
+        # 일치하는 항목이 없으면 오타 허용: 첫 자모가 같고 이름(자모)이 비슷한 항목
+        names = name[(rank == 3) & name.str.startswith(q[0])]
+        close = set(difflib.get_close_matches(q, names.unique().tolist(), n=20, cutoff=FUZZY_CUTOFF))
+        fuzzy = names[names.isin(close)].index
+        return list(fuzzy)
+
+    # 패싯(열 값 목록) 조건으로 라벨을 거름 (순서 유지)
+    @staticmethod
+    def filter(df, labels, **facets):
+        labels = pd.Index(labels)
+        for col, values in facets.items():
+            if values and len(labels):
+                labels = labels[df.loc[labels, col].astype(str).isin([str(v) for v in values]).to_numpy()]
+        return labels
+
+    # 결과 행의 패싯 값별 건수 (필터 선택지 표시용)
+    @staticmethod
+    def facet_counts(df, labels, col):
+        return df.loc[labels, col].astype(str).value_counts().to_dict()
+
+
+# 라벨 목록의 한 페이지 (page는 1부터)
+def paginate(labels, page, size):
+    last = max((len(labels) - 1) // size + 1, 1)
+    page = min(max(int(page), 1), last)
+    return labels[(page - 1) * size:page * size], last
@@ -0,0 +1,650 @@
+import sqlite3
+import threading
+import pandas as pd
+
+# 시트(테이블)별 행 식별 키 및 조회용 인덱스 정의
+SHEET_KEYS = {"Sheet1": "ID", "Users": "username", "Logs": None}
+SHEET_INDEXES = {
+    "Sheet1": [("ID",), ("이름", "대여여부")],
+    "Users": [("username",)],
+    "Logs": [("시간",), ("종류", "시간"), ("작성자", "시간")],
+}
+
+
+# 다른 세션이 먼저 바꾼 행을 덮어쓰려 할 때 발생
+class ConflictError(Exception):
+    def __init__(self, ids):
+        self.ids = [str(i) for i in ids]
+        super().__init__(f"다른 세션에서 먼저 변경된 행: {', '.join(self.ids)}")
+
+
+# 할당량 초과/연결 오류가 재시도 후에도 계속될 때 발생 (데이터가 "없는" 것과 구분)
+class StorageUnavailable(Exception):
+    pass
+
+
+# 저장소 입출력 오류 (화면에서 마지막으로 읽은 데이터로 대신할 수 있는 오류). gspread가 있으면 그 오류도 포함
+STORAGE_ERRORS = (StorageUnavailable, OSError, sqlite3.Error)
+try:
+    from gspread.exceptions import GSpreadException
+    STORAGE_ERRORS += (GSpreadException,)
+except ImportError:
+    pass
+
+# GSheetsConnection.read/update 한 번에 나가는 API 요청 수 (스프레드시트 열기 + 워크시트 조회 + 데이터 읽기/지우기·쓰기)
+CONN_READ_COST = 3
+CONN_WRITE_COST = 4
+
+
+# 행 단위 변경분 (추가 행, 수정된 셀, 삭제 키)
+# base에는 수정/삭제 대상 행의 원래 값을 담아 충돌 검사에 사용합니다.
+class Delta:
+    def __init__(self, inserted=None, updated=None, deleted=None, base=None):
+        self.inserted = inserted if inserted is not None else pd.DataFrame()
+        self.updated = updated or {}
+        self.deleted = [str(k) for k in (deleted or [])]
+        self.base = base if base is not None else pd.DataFrame()
+
+    @property
+    def empty(self):
+        return self.inserted.empty and not self.updated and not self.deleted
+
+    def __len__(self):
+        return len(self.inserted) + len(self.updated) + len(self.deleted)
+
+
+# 1. 저장소 공통 인터페이스
+# read/write만 구현하면 나머지 행 단위 작업은 전체 읽기-쓰기로 동작합니다.
+# 쓰기 작업은 쓰기 직후의 리비전(version)을 반환합니다.
+class StorageBackend:
+    def read(self, sheet_name):
+        raise NotImplementedError
+
+    def write(self, sheet_name, df):
+        raise NotImplementedError
+
+    # 시트 리비전 표시값. None이면 변경 여부를 알 수 없는 저장소(캐시는 ttl로 갱신)
+    def version(self, sheet_name):
+        return None
+
+    def find(self, sheet_name, **equals):
+        df = self.read(sheet_name)
+        if df.empty:
+            return df
+        for col, val in equals.items():
+            if col not in df.columns:
+                return df.iloc[0:0]
+            df = df[df[col].astype(str).str.strip() == str(val)]
+        return df
+
+    def append(self, sheet_name, rows):
+        if rows.empty:
+            return
+        df = self.read(sheet_name)
+        return self.write(sheet_name, pd.concat([df, rows], ignore_index=True))
+
+    def upsert(self, sheet_name, rows, key):
+        if rows.empty:
+            return
+        df = self.read(sheet_name)
+        if df.empty or key not in df.columns:
+            return self.write(sheet_name, pd.concat([df, rows], ignore_index=True))
+        keys = df[key].astype(str)
+        new_rows = []
+        for _, row in rows.iterrows():
+            hit = keys == str(row[key])
+            if hit.any():
+                for col, val in row.items():
+                    if col not in df.columns:
+                        df[col] = ""
+                    df.loc[hit, col] = val
+            else:
+                new_rows.append(row)
+        if new_rows:
+            df = pd.concat([df, pd.DataFrame(new_rows)], ignore_index=True)
+        return self.write(sheet_name, df)
+
+    def delete(self, sheet_name, ids, key):
+        ids = {str(i) for i in ids}
+        if not ids:
+            return
+        df = self.read(sheet_name)
+        if df.empty or key not in df.columns:
+            return
+        return self.write(sheet_name, df[~df[key].astype(str).isin(ids)].reset_index(drop=True))
+
+    # column 값이 value보다 앞서는 행 삭제 (빈 값은 유지). 삭제한 행 수를 반환
+    def delete_before(self, sheet_name, column, value):
+        df = self.read(sheet_name)
+        if df.empty or column not in df.columns:
+            return 0
+        col = df[column].astype(str).str.strip()
+        old = col.ne("") & (col < str(value))
+        if old.any():
+            self.write(sheet_name, df[~old].reset_index(drop=True))
+        return int(old.sum())
+
+    # 시트(테이블) 자체를 없앰. 지울 수 없는 저장소는 내용만 비움
+    def drop(self, sheet_name):
+        self.write(sheet_name, pd.DataFrame())
+
+    # 변경분만 반영. canon은 저장된 값과 원래 값을 같은 형식으로 맞추는 함수(선택)
+    def apply_delta(self, sheet_name, delta, key, canon=None):
+        if delta.empty:
+            return self.version(sheet_name)
+        df = self.read(sheet_name)
+        if key not in df.columns:
+            df[key] = ""
+        _check_conflicts(df, delta, key, canon)
+        keys = df[key].astype(str).str.strip()
+        for k, cols in delta.updated.items():
+            hit = keys == str(k)
+            for col, val in cols.items():
+                if col not in df.columns:
+                    df[col] = ""
+                df.loc[hit, col] = val
+        df = df[~keys.isin(delta.deleted)]
+        if not delta.inserted.empty:
+            df = pd.concat([df, delta.inserted], ignore_index=True)
+        return self.write(sheet_name, df.reset_index(drop=True))
+
+
+# 2. 구글 시트 저장소 (기존 GSheetsConnection 동작 유지)
+# - spreadsheet: 서비스 계정으로 연 gspread 스프레드시트. 있으면 추가/삭제/변경분을 행 단위 API로 처리
+#   (없으면 전체 읽기-쓰기). 워크시트 핸들은 시트별로 한 번만 조회해 재사용합니다.
+# - scheduler: 호출 할당량 스케줄러. 있으면 모든 API 요청이 요청 수만큼 토큰을 쓰고 요청 단위로 재시도합니다.
+#   여러 요청으로 이뤄진 작업을 통째로 다시 실행하지 않으므로 일부만 반영된 뒤 재시도로 중복/충돌이 생기지 않습니다.
+# - 행 번호로 쓰는 작업(추가/앞쪽 삭제/변경분)은 시트별 잠금 안에서 위치 조회부터 쓰기까지 한 번에 처리합니다.
+#   같은 프로세스의 다른 세션이 그 사이 행을 지우거나 추가해 행 번호가 밀리는 일을 막습니다.
+class GSheetsBackend(StorageBackend):
+    def __init__(self, conn, spreadsheet=None, scheduler=None):
+        self.conn = conn
+        self.spreadsheet = spreadsheet
+        self.scheduler = scheduler
+        self._worksheets = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _sheet_lock(self, sheet_name):
+        with self._locks_guard:
+            return self._locks.setdefault(sheet_name, threading.RLock())
+
+    # API 요청 한 번 (cost: 그 안에서 실제로 나가는 요청 수)
+    def _call(self, fn, *args, cost=1, **kwargs):
+        if self.scheduler is None:
+            return fn(*args, **kwargs)
+        return self.scheduler.call(fn, *args, cost=cost, **kwargs)
+
+    def read(self, sheet_name):
+        return self._call(self.conn.read, worksheet=sheet_name, ttl=0, cost=CONN_READ_COST)
+
+    # 대기 중에 같은 시트의 전체 쓰기가 쌓이면 가장 최신 내용 한 번만 씀
+    def write(self, sheet_name, df):
+        if self.scheduler is None:
+            return self._write(sheet_name, df)
+        return self.scheduler.coalesce(sheet_name, lambda data: self._write(sheet_name, data), df,
+                                       lock=self._sheet_lock(sheet_name))
+
+    def _write(self, sheet_name, df):
+        with self._sheet_lock(sheet_name):
+            try:
+                self._call(self.conn.update, worksheet=sheet_name, data=df, cost=CONN_WRITE_COST)
+            except Exception as e:
+                # 보관 파티션 등 아직 없는 워크시트는 새로 만듦
+                if type(e).__name__ != "WorksheetNotFound":
+                    raise
+                self._call(self.conn.create, worksheet=sheet_name, data=df, cost=CONN_WRITE_COST)
+
+    # 행 단위 API용 워크시트 (스프레드시트가 없거나 워크시트가 아직 없으면 None)
+    def _worksheet(self, sheet_name):
+        if self.spreadsheet is None:
+            return None
+        ws = self._worksheets.get(sheet_name)
+        if ws is None:
+            try:
+                ws = self._call(self.spreadsheet.worksheet, sheet_name)
+            except Exception as e:
+                if type(e).__name__ != "WorksheetNotFound":
+                    raise
+                return None
+            self._worksheets[sheet_name] = ws
+        return ws
+
+    # 워크시트를 삭제해 스프레드시트 셀 한도를 돌려받음
+    def drop(self, sheet_name):
+        with self._sheet_lock(sheet_name):
+            ws = self._worksheet(sheet_name)
+            if ws is None:
+                if self.spreadsheet is None:
+                    super().drop(sheet_name)
+                return
+            self._call(self.spreadsheet.del_worksheet, ws)
+            self._worksheets.pop(sheet_name, None)
+
+    # 시트 끝에 행만 추가 (기존 내용을 다시 읽거나 쓰지 않음)
+    def append(self, sheet_name, rows):
+        if rows.empty:
+            return
+        with self._sheet_lock(sheet_name):
+            ws = self._worksheet(sheet_name)
+            if ws is None:
+                return super().append(sheet_name, rows)
+            header = self._call(ws.row_values, 1)
+            missing = [c for c in rows.columns if c not in header]
+            if missing:
+                header = header + missing
+                self._call(ws.update, values=[header], range_name="A1")
+            values = [[_cell(v) for v in row] for row in rows.reindex(columns=header).astype(object).values.tolist()]
+            self._call(ws.append_rows, values, value_input_option="USER_ENTERED")
+
+    # 로그처럼 시간순으로 추가되는 시트는 앞쪽 행 범위만 한 번에 삭제 (그 사이 추가된 행은 뒤에 있으므로 안전)
+    def delete_before(self, sheet_name, column, value):
+        with self._sheet_lock(sheet_name):
+            ws = self._worksheet(sheet_name)
+            header = self._call(ws.row_values, 1) if ws is not None else []
+            if column not in header:
+                return super().delete_before(sheet_name, column, value)
+            col = [str(v).strip() for v in self._call(ws.col_values, header.index(column) + 1)[1:]]
+            old = [v != "" and v < str(value) for v in col]
+            n = old.index(False) if False in old else len(old)
+            if sum(old) != n:
+                # 오래된 행이 중간에 섞여 있으면 전체 다시 쓰기
+                return super().delete_before(sheet_name, column, value)
+            if n:
+                self._call(ws.delete_rows, 2, n + 1)
+            return n
+
+    # 바뀐 셀만 batch_update, 새 행은 append, 삭제는 연속된 행 범위별로 제거
+    def apply_delta(self, sheet_name, delta, key, canon=None):
+        if delta.empty:
+            return None
+        with self._sheet_lock(sheet_name):
+            return self._apply_delta(sheet_name, delta, key, canon)
+
+    def _apply_delta(self, sheet_name, delta, key, canon):
+        ws = self._worksheet(sheet_name)
+        header = self._call(ws.row_values, 1) if ws is not None else []
+        if key not in header:
+            return super().apply_delta(sheet_name, delta, key, canon)
+        key_col = header.index(key)
+        row_of = {}
+        for i, v in enumerate(self._call(ws.col_values, key_col + 1)[1:], start=2):
+            row_of.setdefault(str(v).strip(), i)
+        wanted = set(map(str, delta.updated)) | set(delta.deleted)
+        if not delta.inserted.empty:
+            wanted |= set(delta.inserted[key].astype(str))
+        rows = sorted(row_of[k] for k in wanted if k in row_of)
+        fetched = self._call(ws.batch_get, [f"{r}:{r}" for r in rows]) if rows else []
+        values = {r: ((list(v[0]) if v else []) + [""] * len(header))[:len(header)] for r, v in zip(rows, fetched)}
+        # 위치를 읽은 뒤 다른 프로세스가 행을 옮겼다면 그 행 번호의 ID가 달라져 있음 -> 쓰지 않고 충돌 처리
+        moved = [k for k in wanted if k in row_of and str(values[row_of[k]][key_col]).strip() != k]
+        if moved:
+            raise ConflictError(sorted(moved))
+        current = pd.DataFrame(list(values.values()), columns=header)
+        _check_conflicts(current, delta, key, canon)
+
+        new_cols = [c for cols in delta.updated.values() for c in cols if c not in header]
+        new_cols += [c for c in delta.inserted.columns if c not in header]
+        if new_cols:
+            header = header + list(dict.fromkeys(new_cols))
+            self._call(ws.update, values=[header], range_name="A1")
+        cells = [
+            {"range": _a1(row_of[str(k)], header.index(col) + 1), "values": [[_cell(val)]]}
+            for k, cols in delta.updated.items() for col, val in cols.items()
+        ]
+        if cells:
+            self._call(ws.batch_update, cells, value_input_option="USER_ENTERED")
+        # 아래쪽 범위부터 지워야 위쪽 행 번호가 바뀌지 않음
+        for start, end in reversed(_runs(sorted(row_of[k] for k in delta.deleted if k in row_of))):
+            self._call(ws.delete_rows, start, end)
+        if not delta.inserted.empty:
+            values = [[_cell(v) for v in row] for row in delta.inserted.reindex(columns=header).astype(object).values.tolist()]
+            self._call(ws.append_rows, values, value_input_option="USER_ENTERED")
+        return None
+
+
+# 3. 로컬 SQLite 저장소 (WAL 모드, 인덱스 조회 및 행 단위 쓰기)
+class SQLiteBackend(StorageBackend):
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute('CREATE TABLE IF NOT EXISTS "_meta" (sheet TEXT PRIMARY KEY, rev INTEGER NOT NULL)')
+
+    def _columns(self, sheet_name):
+        rows = self._db.execute(f"PRAGMA table_info({_q(sheet_name)})").fetchall()
+        return [r[1] for r in rows]
+
+    def _ensure_table(self, sheet_name, columns):
+        existing = self._columns(sheet_name)
+        if not existing:
+            # 타입을 지정하지 않아 시트처럼 입력 값을 그대로 보관
+            cols = ", ".join(_q(c) for c in columns)
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS {_q(sheet_name)} ({cols})")
+        else:
+            for col in columns:
+                if col not in existing:
+                    self._db.execute(f"ALTER TABLE {_q(sheet_name)} ADD COLUMN {_q(col)}")
+        columns = self._columns(sheet_name)
+        for idx_cols in SHEET_INDEXES.get(sheet_name, []):
+            if all(c in columns for c in idx_cols):
+                name = f"ix_{sheet_name}_{'_'.join(idx_cols)}"
+                self._db.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_q(name)} ON {_q(sheet_name)} ({', '.join(_q(c) for c in idx_cols)})"
+                )
+
+    def _bump(self, sheet_name):
+        self._db.execute(
+            'INSERT INTO "_meta" (sheet, rev) VALUES (?, 1) ON CONFLICT(sheet) DO UPDATE SET rev = rev + 1',
+            (sheet_name,),
+        )
+        return self._db.execute('SELECT rev FROM "_meta" WHERE sheet = ?', (sheet_name,)).fetchone()[0]
+
+    # 쓰기마다 증가하는 리비전 (다른 프로세스의 쓰기도 반영됨)
+    def version(self, sheet_name):
+        with self._lock:
+            row = self._db.execute('SELECT rev FROM "_meta" WHERE sheet = ?', (sheet_name,)).fetchone()
+            return row[0] if row else 0
+
+    def _select(self, sql, params=()):
+        with self._lock:
+            cur = self._db.execute(sql, params)
+            cols = [d[0] for d in cur.description]
+            return pd.DataFrame(cur.fetchall(), columns=cols)
+
+    def read(self, sheet_name):
+        with self._lock:
+            if not self._columns(sheet_name):
+                return pd.DataFrame()
+            return self._select(f"SELECT * FROM {_q(sheet_name)} ORDER BY rowid")
+
+    def write(self, sheet_name, df):
+        with self._lock, self._transaction():
+            self._ensure_table(sheet_name, list(df.columns))
+            self._db.execute(f"DELETE FROM {_q(sheet_name)}")
+            self._insert(sheet_name, df)
+            return self._bump(sheet_name)
+
+    def find(self, sheet_name, **equals):
+        with self._lock:
+            columns = self._columns(sheet_name)
+            if not columns:
+                return pd.DataFrame()
+            if any(c not in columns for c in equals):
+                return pd.DataFrame(columns=columns)
+            where = " AND ".join(f"{_q(c)} = ?" for c in equals) or "1"
+            return self._select(
+                f"SELECT * FROM {_q(sheet_name)} WHERE {where} ORDER BY rowid",
+                [_value(v) for v in equals.values()],
+            )
+
+    def append(self, sheet_name, rows):
+        if rows.empty:
+            return
+        with self._lock, self._transaction():
+            self._ensure_table(sheet_name, list(rows.columns))
+            self._insert(sheet_name, rows)
+            return self._bump(sheet_name)
+
+    def upsert(self, sheet_name, rows, key):
+        if rows.empty:
+            return
+        with self._lock, self._transaction():
+            self._ensure_table(sheet_name, list(rows.columns))
+            cols = list(rows.columns)
+            sets = ", ".join(f"{_q(c)} = ?" for c in cols)
+            for rec in _records(rows):
+                row = dict(zip(cols, rec))
+                cur = self._db.execute(
+                    f"UPDATE {_q(sheet_name)} SET {sets} WHERE {_q(key)} = ?",
+                    rec + [row[key]],
+                )
+                if cur.rowcount == 0:
+                    self._db.execute(
+                        f"INSERT INTO {_q(sheet_name)} ({', '.join(_q(c) for c in cols)}) VALUES ({', '.join('?' * len(cols))})",
+                        rec,
+                    )
+            return self._bump(sheet_name)
+
+    def delete(self, sheet_name, ids, key):
+        ids = [_value(i) for i in ids]
+        if not ids:
+            return
+        with self._lock, self._transaction():
+            if key not in self._columns(sheet_name):
+                return
+            self._db.executemany(
+                f"DELETE FROM {_q(sheet_name)} WHERE {_q(key)} = ?", [(i,) for i in ids]
+            )
+            return self._bump(sheet_name)
+
+    # 변경된 셀만 UPDATE, 충돌 검사와 반영을 한 트랜잭션에서 처리
+    def apply_delta(self, sheet_name, delta, key, canon=None):
+        if delta.empty:
+            return self.version(sheet_name)
+        columns = list(delta.inserted.columns) + [c for cols in delta.updated.values() for c in cols] + [key]
+        with self._lock, self._transaction():
+            self._ensure_table(sheet_name, list(dict.fromkeys(columns)))
+            wanted = list(set(map(str, delta.updated)) | set(delta.deleted))
+            if not delta.inserted.empty:
+                wanted += [str(k) for k in delta.inserted[key]]
+            parts = []
+            for i in range(0, len(wanted), 500):
+                chunk = wanted[i:i + 500]
+                parts.append(self._select(
+                    f"SELECT * FROM {_q(sheet_name)} WHERE {_q(key)} IN ({', '.join('?' * len(chunk))})", chunk
+                ))
+            current = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=[key])
+            _check_conflicts(current, delta, key, canon)
+            for k, cols in delta.updated.items():
+                sets = ", ".join(f"{_q(c)} = ?" for c in cols)
+                self._db.execute(
+                    f"UPDATE {_q(sheet_name)} SET {sets} WHERE {_q(key)} = ?",
+                    [_value(v) for v in cols.values()] + [str(k)],
+                )
+            self._db.executemany(
+                f"DELETE FROM {_q(sheet_name)} WHERE {_q(key)} = ?", [(k,) for k in delta.deleted]
+            )
+            self._insert(sheet_name, delta.inserted)
+            return self._bump(sheet_name)
+
+    # 활동 로그 서버 측 조회: 시간 인덱스를 따라 최신순으로 한 페이지만 읽음
+    # 전체 건수(count)는 매 페이지마다 세지 않도록 호출하는 쪽에서 리비전별로 캐시할 수 있음 (count=False)
+    def query_logs(self, start=None, end=None, kinds=None, authors=None, item="",
+                   offset=0, limit=50, sheet_name="Logs", count=True):
+        with self._lock:
+            if not self._columns(sheet_name):
+                return pd.DataFrame(), 0
+            clause, params = _log_where(start, end, kinds, authors, item)
+            total = self.count_logs(start, end, kinds, authors, item, sheet_name) if count else None
+            page = self._select(
+                f'SELECT * FROM {_q(sheet_name)} {clause} ORDER BY "시간" DESC, rowid DESC LIMIT ? OFFSET ?',
+                params + [int(limit), int(offset)],
+            )
+            return page, total
+
+    def count_logs(self, start=None, end=None, kinds=None, authors=None, item="", sheet_name="Logs"):
+        with self._lock:
+            if not self._columns(sheet_name):
+                return 0
+            clause, params = _log_where(start, end, kinds, authors, item)
+            return self._db.execute(f"SELECT COUNT(*) FROM {_q(sheet_name)} {clause}", params).fetchone()[0]
+
+    def distinct(self, sheet_name, column):
+        with self._lock:
+            if column not in self._columns(sheet_name):
+                return []
+            rows = self._db.execute(
+                f"SELECT DISTINCT {_q(column)} FROM {_q(sheet_name)} WHERE {_q(column)} IS NOT NULL ORDER BY 1"
+            ).fetchall()
+            return [str(r[0]) for r in rows if str(r[0]).strip()]
+
+    def drop(self, sheet_name):
+        with self._lock, self._transaction():
+            self._db.execute(f"DROP TABLE IF EXISTS {_q(sheet_name)}")
+            self._db.execute('DELETE FROM "_meta" WHERE sheet = ?', (sheet_name,))
+
+    def delete_before(self, sheet_name, column, value):
+        with self._lock, self._transaction():
+            if column not in self._columns(sheet_name):
+                return 0
+            cur = self._db.execute(
+                f"DELETE FROM {_q(sheet_name)} WHERE TRIM({_q(column)}) <> '' AND TRIM({_q(column)}) < ?", (str(value),)
+            )
+            if cur.rowcount:
+                self._bump(sheet_name)
+            return cur.rowcount
+
+    # 백업용 조각 읽기: cursor(rowid) 이후 행을 chunk_size씩 (조각, 마지막 rowid)로 반환
+    # 조각마다 잠금을 풀어 긴 내보내기 중에도 다른 세션의 쓰기가 막히지 않음
+    def iter_rows(self, sheet_name, chunk_size=5000, cursor=None):
+        cursor = int(cursor or 0)
+        while True:
+            with self._lock:
+                if not self._columns(sheet_name):
+                    return
+                chunk = self._select(
+                    f'SELECT rowid AS "_rowid", * FROM {_q(sheet_name)} WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                    (cursor, int(chunk_size)),
+                )
+            if chunk.empty:
+                return
+            cursor = int(chunk["_rowid"].iloc[-1])
+            yield chunk.drop(columns="_rowid"), cursor
+            if len(chunk) < chunk_size:
+                return
+
+    def _insert(self, sheet_name, df):
+        if df.empty:
+            return
+        cols = ", ".join(_q(c) for c in df.columns)
+        marks = ", ".join("?" * len(df.columns))
+        self._db.executemany(f"INSERT INTO {_q(sheet_name)} ({cols}) VALUES ({marks})", _records(df))
+
+    def _transaction(self):
+        return _Transaction(self._db)
+
+
+class _Transaction:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+# 로그 조회 조건 (기간/종류/작성자/장비이름)
+def _log_where(start=None, end=None, kinds=None, authors=None, item=""):
+    where, params = [], []
+    if start is not None:
+        where.append('"시간" >= ?')
+        params.append(str(start))
+    if end is not None:
+        # 날짜 끝까지 포함 ("YYYY-MM-DD HH:MM:SS" 문자열 비교)
+        where.append('"시간" < ?')
+        params.append(f"{end}~")
+    for col, values in (("종류", kinds), ("작성자", authors)):
+        if values:
+            where.append(f"{_q(col)} IN ({', '.join('?' * len(values))})")
+            params.extend(str(v) for v in values)
+    if item:
+        where.append('"장비이름" LIKE ?')
+        params.append(f"%{item}%")
+    return (f"WHERE {' AND '.join(where)}" if where else ""), params
+
+
+def _q(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _value(v):
+    if v is None or (isinstance(v, float) and v != v):
+        return None
+    if isinstance(v, (str, int, float)):
+        return v
+    if hasattr(v, "item"):
+        # numpy 스칼라는 파이썬 기본형으로 변환
+        return v.item()
+    return str(v)
+
+
+def _cell(v):
+    v = _value(v)
+    return "" if v is None else v
+
+
+# 정렬된 행 번호를 연속 구간 [(시작, 끝), ...]으로 묶음
+def _runs(rows):
+    runs = []
+    for r in rows:
+        if runs and r == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], r)
+        else:
+            runs.append((r, r))
+    return runs
+
+
+def _a1(row, col):
+    letters = ""
+    while col:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return f"{letters}{row}"
+
+
+def _same(a, b):
+    a, b = str(_cell(a)).strip(), str(_cell(b)).strip()
+    if a == b:
+        return True
+    try:
+        return float(a) == float(b)
+    except ValueError:
+        return False
+
+
+# 수정/삭제 대상이 그대로인지, 추가할 키가 이미 없는지 확인
+def _check_conflicts(current, delta, key, canon=None):
+    if current.empty:
+        current = pd.DataFrame(columns=list(current.columns) or [key])
+    base = delta.base
+    if canon is not None:
+        current = canon(current) if not current.empty else current
+        base = canon(base) if not base.empty else base
+    cur_rows = {}
+    for row in current.to_dict("records"):
+        cur_rows.setdefault(str(row.get(key, "")).strip(), row)
+    base_rows = {str(row.get(key, "")).strip(): row for row in base.to_dict("records")}
+    conflicts = []
+    for k in list(map(str, delta.updated)) + delta.deleted:
+        cur, old = cur_rows.get(k), base_rows.get(k)
+        if cur is None:
+            conflicts.append(k)
+        elif old is not None and any(col in cur and not _same(val, cur[col]) for col, val in old.items()):
+            conflicts.append(k)
+    if not delta.inserted.empty:
+        conflicts += [k for k in delta.inserted[key].astype(str) if k in cur_rows]
+    if conflicts:
+        raise ConflictError(conflicts)
+
+
+def _records(df):
+    return [[_value(v) for v in row] for row in df.astype(object).values.tolist()]
+
+
+# 4. 저장소 간 데이터 이전 (구글 시트 -> 로컬 SQLite 등). 복사한 시트별 행 수를 반환
+# 대상에 이미 데이터가 있는 시트는 overwrite=True일 때만 덮어씀
+def migrate(src, dst, sheet_names=("Sheet1", "Users", "Logs"), overwrite=False):
+    copied = {}
+    for name in sheet_names:
+        if not overwrite and not dst.read(name).empty:
+            continue
+        df = src.read(name)
+        if df is not None and not df.empty:
+            dst.write(name, df)
+            copied[name] = len(df)
+    return copied
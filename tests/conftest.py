@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 저장소 루트의 모듈(storage, scheduler 등)을 바로 import
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
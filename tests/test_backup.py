@@ -0,0 +1,96 @@
+import os
+import time
+import zipfile
+import pandas as pd
+from backup import BackupManager, frame_chunks, frame_key
+
+LOG_COLUMNS = ["시간", "종류"]
+
+
+def logs(n):
+    return pd.DataFrame({"시간": [f"2024-01-01 09:{i:02d}:00" for i in range(n)], "종류": ["대여"] * n})
+
+
+def inventory():
+    return pd.DataFrame({"ID": ["a", "b"], "수량": [1, 2], "대여여부": ["재고", "대여 중"]})
+
+
+def export(manager, log_df, stamp, incremental=True, inv=None):
+    inv = inventory() if inv is None else inv
+    key = (frame_key(inv), len(log_df))
+    return manager.export("csv", inv, LOG_COLUMNS, lambda cursor: frame_chunks(log_df, 2, cursor), key,
+                          incremental=incremental, stamp=stamp)
+
+
+def exported_logs(path):
+    with zipfile.ZipFile(path) as zf, zf.open("활동로그.csv") as f:
+        return len(pd.read_csv(f))
+
+
+def test_frame_key_tracks_content():
+    inv = inventory()
+    assert frame_key(inv) == frame_key(inv.copy())
+    changed = inv.copy()
+    changed.loc[1, "대여여부"] = "재고"
+    assert frame_key(changed) != frame_key(inv)
+
+
+def test_same_content_reuses_file(tmp_path):
+    manager = BackupManager(str(tmp_path))
+    first = export(manager, logs(3), "1", incremental=False)
+    assert export(manager, logs(3), "2", incremental=False) == first
+    changed = inventory()
+    changed.loc[0, "수량"] = 5
+    assert export(manager, logs(3), "3", incremental=False, inv=changed) != first
+
+
+def test_watermark_advances_only_on_confirm(tmp_path):
+    manager = BackupManager(str(tmp_path))
+    first = export(manager, logs(5), "1")
+    assert exported_logs(first) == 5
+    assert manager.watermark() is None
+    # 받지 않은 백업의 로그는 다음 증분에 다시 포함
+    assert exported_logs(export(manager, logs(6), "2")) == 6
+    assert manager.confirm(first)
+    assert manager.watermark() == 5
+    assert exported_logs(export(manager, logs(7), "3")) == 2
+    assert not manager.confirm(str(tmp_path / "없는 파일.zip"))
+
+
+def test_watermark_never_moves_back(tmp_path):
+    manager = BackupManager(str(tmp_path))
+    older = export(manager, logs(3), "1")
+    newer = export(manager, logs(6), "2")
+    manager.confirm(newer)
+    manager.confirm(older)
+    assert manager.watermark() == 6
+
+
+def test_rebase_shifts_watermark_and_pending_files(tmp_path):
+    manager = BackupManager(str(tmp_path))
+    manager.confirm(export(manager, logs(6), "1"))
+    pending = export(manager, logs(9), "2")
+    # 앞쪽 로그 4행이 보관되어 행 위치가 당겨짐
+    manager.rebase(4)
+    assert manager.watermark() == 2
+    manager.confirm(pending)
+    assert manager.watermark() == 5
+    manager.rebase(10)
+    assert manager.watermark() == 0
+
+
+def test_incremental_files_kept_until_newer_full_backup(tmp_path):
+    manager = BackupManager(str(tmp_path), keep=1)
+    incremental = export(manager, logs(3), "1")
+    time.sleep(0.02)
+    full = export(manager, logs(3), "2", incremental=False)
+    assert not os.path.exists(incremental)
+    time.sleep(0.02)
+    newer_incremental = export(manager, logs(4), "3")
+    time.sleep(0.02)
+    newest_full = export(manager, logs(4), "4", incremental=False)
+    assert os.path.exists(newest_full)
+    assert not os.path.exists(full)
+    assert not os.path.exists(newer_incremental)
+    time.sleep(0.02)
+    assert os.path.exists(export(manager, logs(5), "5"))
@@ -0,0 +1,51 @@
+import threading
+import time
+from cache import SheetCache
+
+
+def test_concurrent_misses_load_once():
+    cache = SheetCache()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("Sheet1", loader, version=1))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert results == ["value"] * 8
+
+
+def test_version_change_reloads():
+    cache = SheetCache()
+    assert cache.get("Sheet1", lambda: "v1", version=1) == "v1"
+    assert cache.get("Sheet1", lambda: "stale", version=1) == "v1"
+    assert cache.get("Sheet1", lambda: "v2", version=2) == "v2"
+
+
+def test_invalidate_during_load_does_not_store_stale_value():
+    cache = SheetCache(ttl=3600)
+    loading, release = threading.Event(), threading.Event()
+
+    def slow_loader():
+        loading.set()
+        release.wait(5)
+        return "old"
+
+    results = []
+    t = threading.Thread(target=lambda: results.append(cache.get("Sheet1", slow_loader)))
+    t.start()
+    loading.wait(5)
+    # 읽는 도중 다른 세션이 저장
+    cache.invalidate("Sheet1")
+    release.set()
+    t.join()
+    assert results == ["old"]
+    assert cache.get("Sheet1", lambda: "new") == "new"
+    assert cache.peek("Sheet1") == "new"
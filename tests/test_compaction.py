@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+import pandas as pd
+import pytest
+from compaction import FileArchive, SheetArchive, SnapshotScheduler, compact, inventory_at, take_snapshot
+from fakes import FakeAPIError, FakeGSheetsConnection
+from storage import GSheetsBackend, SQLiteBackend
+
+LOG_COLUMNS = ['시간', '종류', '장비이름', '수량', '대상', '이전상태']
+
+
+def log(ts, kind, qty, target="", prev=""):
+    return dict(zip(LOG_COLUMNS, [ts, kind, "cam", qty, target, prev]))
+
+
+def inventory(stock, rented=0, dispatched=0):
+    rows = [{"이름": "cam", "수량": stock, "대여여부": "재고", "대여자": ""}]
+    if rented:
+        rows.append({"이름": "cam", "수량": rented, "대여여부": "대여 중", "대여자": "ACME"})
+    if dispatched:
+        rows.append({"이름": "cam", "수량": dispatched, "대여여부": "현장 출고", "대여자": "SiteA"})
+    return pd.DataFrame(rows)
+
+
+# 1월 10일 대여 2, 2월 5일 반납 2, 2월 20일 현장출고 1 (현재 재고: 재고 4 + 현장 출고 1)
+LOGS = pd.DataFrame([
+    log("2024-01-10 10:00:00", "대여", 2, "ACME"),
+    log("2024-02-05 10:00:00", "반납", 2, "ACME", "대여 중"),
+    log("2024-02-20 10:00:00", "현장출고", 1, "SiteA"),
+])
+
+
+def state(df):
+    return {(r["대여여부"], r["대여자"]): int(r["수량"]) for r in df.to_dict("records")}
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "r2d2.db"))
+    backend.write("Sheet1", inventory(4, dispatched=1))
+    backend.write("Logs", LOGS)
+    return backend
+
+
+@pytest.mark.parametrize("ts, expected", [
+    ("2024-01-01 00:00:00", {("재고", ""): 5}),
+    ("2024-01-15 00:00:00", {("재고", ""): 3, ("대여 중", "ACME"): 2}),
+    ("2024-02-10 00:00:00", {("재고", ""): 5}),
+    ("2024-03-01 00:00:00", {("재고", ""): 4, ("현장 출고", "SiteA"): 1}),
+])
+def test_inventory_at_replays_forward_and_backward(backend, tmp_path, ts, expected):
+    archive = FileArchive(str(tmp_path / "archive"))
+    # 1월 15일 스냅샷에서 앞/뒤로 재생
+    backend.write("Sheet1", inventory(3, rented=2))
+    take_snapshot(backend, archive, datetime(2024, 1, 15))
+    backend.write("Sheet1", inventory(4, dispatched=1))
+    assert state(inventory_at(backend, archive, ts)) == expected
+    # 현재 재고를 기준점으로 거꾸로 재생해도 같은 결과
+    current = ("2024-03-01 00:00:00", inventory(4, dispatched=1))
+    assert state(inventory_at(backend, FileArchive(str(tmp_path / "empty")), ts, current=current)) == expected
+
+
+def test_compact_moves_closed_months_and_keeps_replay(backend, tmp_path):
+    archive = FileArchive(str(tmp_path / "archive"))
+    result = compact(backend, archive, hot_days=20, now=datetime(2024, 3, 10))
+    assert result["cutoff"] == "2024-02-01"
+    assert result["archived"] == {"2024-01": 1}
+    assert result["removed"] == 1
+    assert len(backend.read("Logs")) == 2
+    assert archive.names() == ["logs_2024-01", result["snapshot"]]
+    # 다시 실행해도 보관 파티션에 중복 행이 생기지 않음
+    compact(backend, archive, hot_days=20, now=datetime(2024, 3, 11))
+    assert len(archive.read("logs_2024-01")) == 1
+    assert state(inventory_at(backend, archive, "2024-01-05 00:00:00")) == {("재고", ""): 5}
+
+
+def test_compact_prunes_old_snapshots(backend, tmp_path):
+    archive = FileArchive(str(tmp_path / "archive"))
+    for day in range(1, 5):
+        compact(backend, archive, hot_days=400, now=datetime(2024, 3, day), keep_snapshots=2)
+    assert [n for n in archive.names() if n.startswith("snapshot_")] == [
+        "snapshot_20240303_000000", "snapshot_20240304_000000"]
+
+
+def test_snapshot_scheduler_respects_interval(backend, tmp_path):
+    archive = FileArchive(str(tmp_path / "archive"))
+    scheduler = SnapshotScheduler(backend, archive, interval_hours=24, keep=2)
+    scheduler.stop()
+    scheduler._thread.join(5)
+    start = datetime.now()
+    assert scheduler.run_once(start + timedelta(hours=1)) is None
+    assert scheduler.run_once(start + timedelta(hours=25)) is not None
+    assert scheduler.run_once(start + timedelta(hours=50)) is not None
+    assert len([n for n in archive.names() if n.startswith("snapshot_")]) == 2
+
+
+def test_catalog_read_failure_keeps_catalog(tmp_path):
+    conn = FakeGSheetsConnection({"Sheet1": inventory(4, dispatched=1), "Logs": LOGS})
+    backend = GSheetsBackend(conn, conn.spreadsheet)
+    archive = SheetArchive(backend)
+    compact(backend, archive, hot_days=20, now=datetime(2024, 3, 10))
+    names = archive.names()
+    assert "logs_2024-01" in names
+
+    read = conn.read
+
+    def unavailable_catalog(worksheet=None, **kwargs):
+        if worksheet == "Archive":
+            raise FakeAPIError(503, "backendError")
+        return read(worksheet=worksheet, **kwargs)
+
+    conn.read = unavailable_catalog
+    with pytest.raises(FakeAPIError):
+        take_snapshot(backend, archive, datetime(2024, 3, 11))
+    conn.read = read
+    # 목록을 빈 것으로 덮어쓰지 않고, 목록에 없는 스냅샷 시트도 남기지 않음
+    assert "snapshot_20240311_000000" not in conn.sheets
+    assert set(names) <= set(archive.names())
+    assert state(inventory_at(backend, archive, "2024-01-12 00:00:00")) == {("재고", ""): 3, ("대여 중", "ACME"): 2}
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+from fakes import FakeGSheetsConnection
+from inventory import diff_frames
+from schema import normalize
+from storage import ConflictError, GSheetsBackend
+
+
+def sheet():
+    return normalize(pd.DataFrame({
+        "ID": ["a", "b", "c"],
+        "이름": ["카메라", "삼각대", "조명"],
+        "수량": [3, 1, 2],
+        "대여여부": ["재고", "재고", "대여 중"],
+        "대여일": ["", "", "2024-03-01"],
+    }), "Sheet1")
+
+
+def test_diff_frames_reports_only_changed_cells():
+    before = sheet()
+    after = before.copy()
+    after.loc[0, "수량"] = 5
+    after = after.drop(index=2)
+    after = pd.concat([after, normalize(pd.DataFrame({"ID": ["d"], "이름": ["마이크"], "수량": [1]}), "Sheet1")])
+    delta = diff_frames(before, after)
+    assert delta.updated == {"a": {"수량": 5}}
+    assert delta.deleted == ["c"]
+    assert list(delta.inserted["ID"]) == ["d"]
+    assert sorted(delta.base["ID"]) == ["a", "c"]
+
+
+def test_diff_frames_unchanged_page_is_empty():
+    assert diff_frames(sheet(), sheet()).empty
+
+
+@pytest.mark.parametrize("ids", [["a", "a", "c"], ["a", "", "c"]])
+def test_diff_frames_needs_unique_ids(ids):
+    after = sheet()
+    after["ID"] = ids
+    assert diff_frames(sheet(), after) is None
+
+
+def test_full_rewrite_fallback_applies_delta_and_detects_conflicts():
+    # 행 단위 API가 없는 연결은 전체 읽기-쓰기로 변경분을 반영
+    conn = FakeGSheetsConnection({"Sheet1": sheet()})
+    backend = GSheetsBackend(conn)
+    edited = normalize(conn.read("Sheet1"), "Sheet1")
+    edited.loc[1, "대여여부"] = "수리 중"
+    delta = diff_frames(normalize(conn.read("Sheet1"), "Sheet1"), edited)
+    backend.apply_delta("Sheet1", delta, "ID")
+    assert list(conn.sheets["Sheet1"]["대여여부"]) == ["재고", "수리 중", "대여 중"]
+    # 같은 변경분을 다시 보내면 기준값이 달라져 충돌
+    with pytest.raises(ConflictError) as e:
+        backend.apply_delta("Sheet1", delta, "ID")
+    assert e.value.ids == ["b"]
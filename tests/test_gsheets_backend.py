@@ -0,0 +1,136 @@
+import threading
+import pandas as pd
+import pytest
+from fakes import FakeGSheetsConnection
+from scheduler import Scheduler
+from storage import ConflictError, Delta, GSheetsBackend, StorageUnavailable
+
+
+def inventory(n=10):
+    return pd.DataFrame({
+        "ID": [f"id-{i}" for i in range(n)],
+        "이름": [f"장비 {i}" for i in range(n)],
+        "대여여부": ["재고"] * n,
+    })
+
+
+def make_backend(n=10, scheduler=True, **conn_options):
+    conn = FakeGSheetsConnection({"Sheet1": inventory(n)}, seed=1, **conn_options)
+    sched = Scheduler(rate_per_min=600000, burst=1000, max_retries=20, retry_base=0.001, retry_cap=0.005) if scheduler else None
+    return GSheetsBackend(conn, conn.spreadsheet, sched), conn
+
+
+def base_rows(ids, n=10):
+    df = inventory(n)
+    return df[df["ID"].isin(ids)]
+
+
+def test_read_retries_through_injected_429s():
+    backend, conn = make_backend(error_rate=0.5)
+    df = backend.read("Sheet1")
+    assert list(df["ID"]) == [f"id-{i}" for i in range(10)]
+    assert backend.scheduler.stats["retries"] == conn.calls["rejected"]
+
+
+def test_persistent_429_raises_storage_unavailable():
+    backend, conn = make_backend(error_rate=1.0)
+    backend.scheduler.max_retries = 2
+    with pytest.raises(StorageUnavailable):
+        backend.read("Sheet1")
+    assert conn.calls["rejected"] == 3
+
+
+def test_apply_delta_under_429s_reaches_expected_state():
+    backend, conn = make_backend(error_rate=0.3)
+    inserted = pd.DataFrame({"ID": ["id-new"], "이름": ["새 장비"], "대여여부": ["재고"]})
+    delta = Delta(
+        inserted=inserted,
+        updated={"id-1": {"대여여부": "대여 중"}},
+        deleted=["id-3", "id-4", "id-7"],
+        base=base_rows(["id-1", "id-3", "id-4", "id-7"]),
+    )
+    backend.apply_delta("Sheet1", delta, "ID")
+    sheet = conn.sheets["Sheet1"]
+    assert list(sheet["ID"]) == ["id-0", "id-1", "id-2", "id-5", "id-6", "id-8", "id-9", "id-new"]
+    assert sheet.loc[sheet["ID"] == "id-1", "대여여부"].item() == "대여 중"
+    assert conn.calls["rejected"] > 0
+    # 재시도는 요청 단위: 일부만 반영된 작업을 통째로 다시 실행하지 않음
+    assert conn.calls["append_rows"] == 1
+    assert conn.calls["delete_rows"] == 2
+
+
+def test_concurrent_deltas_keep_row_positions():
+    backend, conn = make_backend(n=20, latency=0.001)
+    errors = []
+
+    def worker(i):
+        keep, drop = f"id-{2 * i}", f"id-{2 * i + 1}"
+        delta = Delta(updated={keep: {"대여여부": "대여 중"}}, deleted=[drop], base=base_rows([keep, drop], 20))
+        try:
+            backend.apply_delta("Sheet1", delta, "ID")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    sheet = conn.sheets["Sheet1"]
+    assert list(sheet["ID"]) == [f"id-{2 * i}" for i in range(10)]
+    assert set(sheet["대여여부"]) == {"대여 중"}
+
+
+def test_row_moved_after_lookup_raises_conflict():
+    backend, conn = make_backend(scheduler=False)
+    ws = backend._worksheet("Sheet1")
+    batch_get = ws.batch_get
+
+    # 위치 조회와 행 읽기 사이에 다른 프로세스가 맨 앞 행을 삭제
+    def moved_batch_get(ranges, **kwargs):
+        conn.sheets["Sheet1"] = conn.sheets["Sheet1"].iloc[1:].reset_index(drop=True)
+        return batch_get(ranges, **kwargs)
+
+    ws.batch_get = moved_batch_get
+    delta = Delta(updated={"id-5": {"대여여부": "대여 중"}}, base=base_rows(["id-5"]))
+    with pytest.raises(ConflictError) as e:
+        backend.apply_delta("Sheet1", delta, "ID")
+    assert e.value.ids == ["id-5"]
+    assert set(conn.sheets["Sheet1"]["대여여부"]) == {"재고"}
+
+
+def test_changed_base_raises_conflict():
+    backend, conn = make_backend(scheduler=False)
+    conn.sheets["Sheet1"].loc[2, "대여여부"] = "수리 중"
+    delta = Delta(updated={"id-2": {"대여여부": "대여 중"}}, base=base_rows(["id-2"]))
+    with pytest.raises(ConflictError):
+        backend.apply_delta("Sheet1", delta, "ID")
+    assert conn.sheets["Sheet1"].loc[2, "대여여부"] == "수리 중"
+
+
+def test_concurrent_writes_are_coalesced():
+    backend, conn = make_backend()
+    frames = [inventory(n) for n in range(1, 6)]
+    with backend._sheet_lock("Sheet1"):
+        threads = [threading.Thread(target=backend.write, args=("Sheet1", df)) for df in frames]
+        for t in threads:
+            t.start()
+        while backend.scheduler._latest.get("Sheet1", (0, None))[0] < len(frames):
+            threading.Event().wait(0.001)
+    for t in threads:
+        t.join()
+    assert conn.calls["update"] == 1
+    assert len(conn.sheets["Sheet1"]) == len(backend.scheduler._latest["Sheet1"][1])
+
+
+def test_append_and_delete_before_use_row_api():
+    backend, conn = make_backend(scheduler=False)
+    logs = pd.DataFrame({"시간": ["2024-01-01", "2024-01-02", "2024-02-01"], "종류": ["대여", "반납", "대여"]})
+    conn.sheets["Logs"] = logs.astype(object)
+    backend.append("Logs", pd.DataFrame({"시간": ["2024-03-01"], "종류": ["반납"], "대상": ["ACME"]}))
+    assert backend.delete_before("Logs", "시간", "2024-02-01") == 2
+    sheet = conn.sheets["Logs"]
+    assert list(sheet["시간"]) == ["2024-02-01", "2024-03-01"]
+    assert list(sheet["대상"]) == ["", "ACME"]
+    assert conn.calls["read"] == 0 and conn.calls["update"] == 1
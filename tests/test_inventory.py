@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+from inventory import Inventory
+from schema import normalize, to_storage
+from storage import SQLiteBackend
+
+TODAY = "2024-03-10"
+
+
+def snapshot():
+    return normalize(pd.DataFrame({
+        "ID": ["a", "b", "c", "d"],
+        "이름": ["카메라", "삼각대", "조명", "조명"],
+        "수량": [3, 1, 2, 4],
+        "대여여부": ["재고", "재고", "대여 중", "재고"],
+        "대여자": ["", "", "ACME", ""],
+        "대여일": ["", "", "2024-03-01", ""],
+    }), "Sheet1")
+
+
+def inventory():
+    snap = snapshot()
+    return Inventory(snap.copy(), source=snap)
+
+
+def entry(kind, item_id, qty=1, target="현장A"):
+    return {"kind": kind, "id": item_id, "name": item_id, "qty": qty, "target": target, "return_date": ""}
+
+
+@pytest.mark.parametrize("cart", [
+    # 두 번째 항목이 재고 부족: 첫 항목도 반영되지 않아야 함
+    [entry("대여", "a", 1), entry("현장출고", "b", 2)],
+    # 같은 행 수량을 여러 항목에서 합치면 재고 초과
+    [entry("대여", "a", 2), entry("현장출고", "a", 2)],
+    # 같은 항목 중복 반납
+    [entry("반납", "c"), entry("반납", "c")],
+    # 재고 상태인 행 반납
+    [entry("반납", "a")],
+    # 없는 항목
+    [entry("대여", "zzz")],
+])
+def test_invalid_cart_changes_nothing(cart):
+    inv = inventory()
+    totals = dict(inv.totals)
+    with pytest.raises(ValueError):
+        inv.apply_cart(cart, TODAY)
+    pd.testing.assert_frame_equal(inv.df, snapshot())
+    assert inv.totals == totals
+    assert inv.changes().empty
+
+
+def test_mixed_cart_builds_delta():
+    inv = inventory()
+    done = inv.apply_cart([entry("대여", "a", 1, "ACME"), entry("현장출고", "b", 1), entry("반납", "c")], TODAY)
+    assert [e["kind"] for e, _ in done] == ["대여", "현장출고", "반납"]
+    assert inv.total("재고") == 2 + 0 + 6
+    assert inv.total("대여 중") == 1
+    assert inv.total("현장 출고") == 1
+
+    delta = inv.changes()
+    assert delta.updated == {"a": {"수량": 2}, "b": {"수량": 0}, "d": {"수량": 6}}
+    assert delta.deleted == ["c"]
+    assert sorted(delta.inserted["대여여부"]) == ["대여 중", "현장 출고"]
+    assert set(delta.inserted["대여일"]) == {TODAY}
+    assert sorted(delta.base["ID"]) == ["a", "b", "c", "d"]
+
+
+def test_cart_delta_reproduces_inventory_in_storage(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "r2d2.db"))
+    backend.write("Sheet1", to_storage(snapshot(), "Sheet1"))
+    inv = inventory()
+    inv.apply_cart([entry("대여", "a", 1), entry("반납", "c"), entry("현장출고", "d", 4)], TODAY)
+    backend.apply_delta("Sheet1", inv.changes(), "ID")
+    stored = normalize(backend.read("Sheet1"), "Sheet1").set_index("ID").sort_index()
+    expected = to_storage(inv.df, "Sheet1").set_index("ID").sort_index()
+    pd.testing.assert_frame_equal(to_storage(stored, "Sheet1")[expected.columns], expected, check_dtype=False)
+
+
+def test_commit_starts_a_new_delta():
+    inv = inventory()
+    inv.apply_cart([entry("대여", "a", 1)], TODAY)
+    inv.commit(inv.df.copy())
+    assert inv.changes().empty
+    inv.apply_cart([entry("대여", "a", 1)], TODAY)
+    assert inv.changes().updated == {"a": {"수량": 1}}
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+from cache import SheetCache
+from fakes import make_sheets
+from logs import LogIndex, filter_logs
+from storage import SQLiteBackend
+
+FILTERS = [
+    {},
+    {"start": "2024-01-01", "end": "2024-01-01"},
+    {"kinds": ["대여", "반납"]},
+    {"authors": ["user3"], "kinds": ["대여"]},
+    {"item": "장비 1"},
+    {"start": "2024-01-02", "kinds": ["상태변경"], "item": "장비"},
+]
+
+
+@pytest.fixture(scope="module")
+def logs():
+    return make_sheets(rows=50, log_rows=3000)["Logs"]
+
+
+@pytest.fixture(scope="module")
+def sqlite_logs(logs, tmp_path_factory):
+    backend = SQLiteBackend(str(tmp_path_factory.mktemp("logs") / "r2d2.db"))
+    backend.write("Logs", logs)
+    return backend
+
+
+def expected(logs, filters, offset, limit):
+    # 최신순, 같은 시간이면 나중에 기록된 행이 먼저
+    df = filter_logs(logs, **filters).iloc[::-1]
+    return list(df["시간"].iloc[offset:offset + limit]), len(df)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("offset", [0, 120])
+def test_log_index_matches_full_filter(logs, filters, offset):
+    page, total = LogIndex(logs).query(offset=offset, limit=50, **filters)
+    assert (list(page["시간"]), total) == expected(logs, filters, offset, 50)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_sqlite_query_matches_full_filter(sqlite_logs, logs, filters):
+    page, total = sqlite_logs.query_logs(offset=30, limit=50, **filters)
+    assert (list(page["시간"]), total) == expected(logs, filters, 30, 50)
+    assert sqlite_logs.count_logs(**filters) == total
+    assert sqlite_logs.query_logs(limit=1, count=False, **filters)[1] is None
+
+
+def test_filter_columns_are_indexed(sqlite_logs):
+    plan = sqlite_logs._db.execute(
+        'EXPLAIN QUERY PLAN SELECT COUNT(*) FROM "Logs" WHERE "종류" IN (?) AND "시간" >= ?', ("대여", "2024-01-02")
+    ).fetchall()
+    assert any("ix_Logs_" in str(row) for row in plan)
+
+
+def test_invalidate_drops_derived_keys():
+    cache = SheetCache(ttl=3600)
+    cache.put("Logs", "logs")
+    cache.get("Logs:count:all", lambda: 10)
+    cache.get("Logsheet", lambda: "other")
+    cache.invalidate("Logs")
+    assert cache.get("Logs:count:all", lambda: 11) == 11
+    assert cache.get("Logsheet", lambda: "reloaded") == "other"
@@ -0,0 +1,63 @@
+import json
+from logs import LogWriter
+from storage import SQLiteBackend
+
+
+class FailingBackend:
+    def __init__(self):
+        self.attempts = 0
+
+    def append(self, sheet_name, rows):
+        self.attempts += 1
+        raise OSError("저장소 연결 끊김")
+
+
+def row(n):
+    return {"시간": f"2024-01-01 09:00:{n:02d}", "작성자": "tester", "종류": "대여", "장비이름": f"장비 {n}"}
+
+
+def spool_rows(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_failed_batch_stays_in_spool(tmp_path):
+    spool = str(tmp_path / "spool.jsonl")
+    backend = FailingBackend()
+    writer = LogWriter(backend, spool, flush_interval=0.01)
+    writer.submit([row(1), row(2)])
+    assert not writer.flush(timeout=0.2)
+    writer.close(timeout=0.1)
+    assert backend.attempts >= 1
+    assert writer.pending() == [row(1), row(2)]
+    assert spool_rows(spool) == [row(1), row(2)]
+
+
+def test_spool_is_replayed_after_restart(tmp_path):
+    spool = str(tmp_path / "spool.jsonl")
+    writer = LogWriter(FailingBackend(), spool, flush_interval=0.01)
+    writer.submit([row(1), row(2)])
+    writer.close(timeout=0.1)
+    # 기록 도중 중단된 마지막 줄
+    with open(spool, "a", encoding="utf-8") as f:
+        f.write('{"시간": "2024-01')
+
+    backend = SQLiteBackend(str(tmp_path / "r2d2.db"))
+    flushed = []
+    writer = LogWriter(backend, spool, flush_interval=0.01, on_flush=lambda: flushed.append(1))
+    assert writer.flush(timeout=5)
+    writer.close()
+    logs = backend.read("Logs")
+    assert list(logs["장비이름"]) == ["장비 1", "장비 2"]
+    assert spool_rows(spool) == []
+    assert flushed
+
+
+def test_batches_are_sent_in_order(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "r2d2.db"))
+    writer = LogWriter(backend, str(tmp_path / "spool.jsonl"), batch_size=3, flush_interval=0.01)
+    for n in range(7):
+        writer.submit([row(n)])
+    assert writer.flush(timeout=5)
+    writer.close()
+    assert list(backend.read("Logs")["시간"]) == [row(n)["시간"] for n in range(7)]
@@ -0,0 +1,122 @@
+import threading
+import time
+import pytest
+from fakes import FakeAPIError
+from scheduler import Scheduler, TokenBucket
+from storage import StorageUnavailable
+
+
+def fast_scheduler(**kwargs):
+    options = dict(rate_per_min=60000, burst=100, max_retries=5, retry_base=0.001, retry_cap=0.01, max_wait=5.0)
+    options.update(kwargs)
+    return Scheduler(**options)
+
+
+def flaky(failures, status=429, message="RATE_LIMIT_EXCEEDED"):
+    calls = []
+
+    def fn(value):
+        calls.append(value)
+        if len(calls) <= failures:
+            raise FakeAPIError(status, message)
+        return value
+    return fn, calls
+
+
+def test_call_retries_only_the_failed_request():
+    s = fast_scheduler()
+    fn, calls = flaky(2)
+    assert s.call(fn, "ok") == "ok"
+    assert len(calls) == 3
+    assert s.stats["retries"] == 2
+
+
+def test_call_raises_storage_unavailable_after_max_retries():
+    s = fast_scheduler(max_retries=3)
+    fn, calls = flaky(10)
+    with pytest.raises(StorageUnavailable):
+        s.call(fn, "x")
+    assert len(calls) == 4
+    assert s.stats["failures"] == 1
+
+
+def test_non_retryable_error_is_not_retried():
+    s = fast_scheduler()
+    fn, calls = flaky(1, status=400, message="INVALID_ARGUMENT")
+    with pytest.raises(FakeAPIError):
+        s.call(fn, "x")
+    assert len(calls) == 1
+
+
+def transient(errors):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+    return fn, calls
+
+
+def test_transport_errors_are_retried():
+    requests = pytest.importorskip("requests")
+    errors = [requests.exceptions.ConnectionError("연결 끊김"), requests.exceptions.ReadTimeout("읽기 시간 초과"),
+              ConnectionResetError(), TimeoutError()]
+    s = fast_scheduler()
+    fn, calls = transient(errors)
+    assert s.call(fn) == "ok"
+    assert len(calls) == 5
+
+
+def test_google_auth_transport_error_is_retried():
+    exceptions = pytest.importorskip("google.auth.exceptions")
+    s = fast_scheduler()
+    fn, calls = transient([exceptions.TransportError("토큰 갱신 실패")])
+    assert s.call(fn) == "ok"
+    assert len(calls) == 2
+
+
+def test_429_drains_bucket():
+    # 초당 100개 충전: 비운 뒤 재시도는 토큰이 찰 때까지 대기
+    s = fast_scheduler(rate_per_min=6000, burst=10)
+    fn, _ = flaky(1)
+    s.call(fn, "x")
+    assert s.bucket.tokens < 1
+    assert s.stats["throttled"] >= 1
+
+
+def test_call_charges_cost_tokens():
+    s = fast_scheduler(rate_per_min=1, burst=10)
+    s.call(lambda: None, cost=3)
+    s.call(lambda: None, cost=3)
+    assert 3.9 < s.bucket.tokens < 4.1
+
+
+def test_bucket_acquire_times_out():
+    bucket = TokenBucket(rate_per_min=1, burst=1)
+    assert bucket.acquire(timeout=0)
+    started = time.monotonic()
+    assert not bucket.acquire(timeout=0.05)
+    assert time.monotonic() - started < 0.5
+
+
+def test_coalesce_writes_latest_value_once():
+    s = fast_scheduler()
+    lock = threading.RLock()
+    written = []
+    results = []
+    # 첫 쓰기가 잠금을 기다리는 동안 쓰기 5건을 쌓음
+    with lock:
+        threads = [threading.Thread(target=lambda v=v: results.append(s.coalesce("Sheet1", written.append, v, lock=lock)))
+                   for v in range(5)]
+        for t in threads:
+            t.start()
+        deadline = time.monotonic() + 5
+        while s._latest.get("Sheet1", (0, None))[0] < 5 and time.monotonic() < deadline:
+            time.sleep(0.001)
+    for t in threads:
+        t.join()
+    assert written == [s._latest["Sheet1"][1]]
+    assert s.stats["coalesced"] == 4
+    assert len(results) == 5
@@ -0,0 +1,54 @@
+import pandas as pd
+from fakes import make_sheets
+from schema import FIELD_NAMES, normalize, to_storage
+
+
+def raw_sheet():
+    # 구글 시트에서 읽은 그대로: 공백, 숫자/문자열 혼합, 빈 칸, 여러 날짜 형식
+    return pd.DataFrame({
+        "ID": [" a ", "b", "c", "d"],
+        "이름": ["카메라 ", "삼각대", "조명", "마이크"],
+        "수량": ["3", 2, "", "x"],
+        "대여여부": ["재고", "대여 중", "분실", ""],
+        "대여일": ["2024-03-01", "2024/03/02", "", "2024-03-04"],
+        "반납예정일": ["미정", "2024-04-01", "", ""],
+    })
+
+
+def test_normalize_types_columns():
+    df = normalize(raw_sheet(), "Sheet1")
+    assert list(df.columns[:6]) == ["ID", "이름", "수량", "대여여부", "대여일", "반납예정일"]
+    assert set(FIELD_NAMES) <= set(df.columns)
+    assert list(df["ID"]) == ["a", "b", "c", "d"]
+    assert str(df["수량"].dtype) == "int32"
+    assert list(df["수량"]) == [3, 2, 0, 0]
+    # 선언에 없는 상태도 범주로 보존
+    assert isinstance(df["대여여부"].dtype, pd.CategoricalDtype)
+    assert "분실" in df["대여여부"].cat.categories
+    assert pd.api.types.is_datetime64_any_dtype(df["대여일"].dtype)
+    # 날짜가 아닌 메모가 있는 열은 문자열 그대로 둠
+    assert list(df["반납예정일"]) == ["미정", "2024-04-01", "", ""]
+
+
+def test_storage_round_trip_is_stable():
+    stored = to_storage(normalize(raw_sheet(), "Sheet1"), "Sheet1")
+    assert list(stored["대여일"]) == ["2024-03-01", "2024-03-02", "", "2024-03-04"]
+    assert list(stored["대여여부"]) == ["재고", "대여 중", "분실", ""]
+    again = to_storage(normalize(stored, "Sheet1"), "Sheet1")
+    pd.testing.assert_frame_equal(again, stored)
+
+
+def test_generated_sheets_round_trip():
+    for name, raw in make_sheets(rows=200, log_rows=200).items():
+        stored = to_storage(normalize(raw, name), name)
+        pd.testing.assert_frame_equal(to_storage(normalize(stored, name), name), stored)
+
+
+def test_users_approved_is_upper_case():
+    df = normalize(pd.DataFrame({"username": ["a", "b"], "approved": ["true", "False"]}), "Users")
+    assert list(df["approved"]) == ["TRUE", "FALSE"]
+
+
+def test_empty_sheet_gets_declared_columns():
+    df = normalize(pd.DataFrame(), "Logs")
+    assert df.empty and "시간" in df.columns
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+from search import SearchIndex, paginate, to_chosung, to_jamo
+
+
+def catalog():
+    return pd.DataFrame({
+        "이름": ["카메라 A", "소니 카메라", "삼각대", "조명 스탠드", "카메라 가방"],
+        "타입": ["촬영", "촬영", "지지", "조명", "가방"],
+        "브랜드": ["캐논", "소니", "맨프로토", "고독스", "카메라가방코리아"],
+        "특이사항": ["", "", "카메라용", "", ""],
+        "대여여부": ["재고", "대여 중", "재고", "재고", "재고"],
+    }, index=[10, 11, 12, 13, 14])
+
+
+def names(df, labels):
+    return list(df.loc[labels, "이름"])
+
+
+def test_jamo_and_chosung_conversion():
+    assert to_jamo("캄") == "ㅋㅏㅁ"
+    assert to_chosung("카메라") == "ㅋㅁㄹ"
+
+
+@pytest.mark.parametrize("query", ["카메라", "캄", "ㅋㅁㄹ"])
+def test_name_prefix_ranks_before_contains_and_other_fields(query):
+    df = catalog()
+    found = names(df, SearchIndex(df).search(df, query))
+    # 이름 앞부분 일치(입력 순서 유지) > 이름 포함 > 다른 필드(특이사항) 포함
+    assert found[:2] == ["카메라 A", "카메라 가방"]
+    assert found[2] == "소니 카메라"
+    assert found[-1] == "삼각대"
+
+
+def test_typo_falls_back_to_fuzzy_name_match():
+    df = catalog()
+    assert names(df, SearchIndex(df).search(df, "삼각데")) == ["삼각대"]
+    assert SearchIndex(df).search(df, "없는장비이름") == []
+
+
+def test_facets_and_within_limit_results():
+    df = catalog()
+    idx = SearchIndex(df)
+    assert names(df, idx.search(df, "카메라", 대여여부=["재고"])) == ["카메라 A", "카메라 가방", "삼각대"]
+    assert names(df, idx.search(df, "", within=[13, 12])) == ["조명 스탠드", "삼각대"]
+    assert idx.facet_counts(df, idx.search(df, "카메라"), "타입") == {"촬영": 2, "가방": 1, "지지": 1}
+
+
+def test_sync_picks_up_added_and_removed_rows():
+    df = catalog()
+    idx = SearchIndex(df)
+    df = pd.concat([df.drop(index=10), pd.DataFrame({"이름": ["카메라 B"], "타입": ["촬영"], "브랜드": [""],
+                                                     "특이사항": [""], "대여여부": ["재고"]}, index=[15])])
+    assert names(df, idx.search(df, "ㅋㅁㄹ"))[:2] == ["카메라 가방", "카메라 B"]
+    assert 10 not in idx.table.index
+
+
+def test_paginate_clamps_page():
+    labels = list(range(120))
+    assert paginate(labels, 1, 50) == (labels[:50], 3)
+    assert paginate(labels, 3, 50) == (labels[100:], 3)
+    assert paginate(labels, 9, 50) == (labels[100:], 3)
+    assert paginate([], 1, 50) == ([], 1)
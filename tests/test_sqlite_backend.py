@@ -0,0 +1,110 @@
+import pandas as pd
+import pytest
+from storage import ConflictError, Delta, SQLiteBackend, migrate
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "r2d2.db"))
+    backend.write("Sheet1", pd.DataFrame({
+        "ID": ["a", "b", "c"],
+        "이름": ["카메라", "삼각대", "조명"],
+        "대여여부": ["재고", "재고", "재고"],
+    }))
+    return backend
+
+
+def rows(backend, *ids):
+    df = backend.read("Sheet1")
+    return df[df["ID"].isin(ids)]
+
+
+def test_missing_sheet_reads_empty(backend):
+    assert backend.read("Users").empty
+    assert backend.version("Users") == 0
+
+
+def test_writes_bump_version(backend):
+    version = backend.version("Sheet1")
+    backend.append("Sheet1", pd.DataFrame({"ID": ["d"], "이름": ["마이크"], "대여여부": ["재고"]}))
+    assert backend.version("Sheet1") == version + 1
+    backend.upsert("Sheet1", pd.DataFrame({"ID": ["a"], "대여여부": ["대여 중"]}), "ID")
+    backend.delete("Sheet1", ["b"], "ID")
+    df = backend.read("Sheet1")
+    assert list(df["ID"]) == ["a", "c", "d"]
+    assert rows(backend, "a")["대여여부"].item() == "대여 중"
+    assert backend.version("Sheet1") == version + 3
+
+
+def test_append_adds_new_columns(backend):
+    backend.append("Sheet1", pd.DataFrame({"ID": ["d"], "비고": ["새 열"]}))
+    df = backend.read("Sheet1")
+    assert "비고" in df.columns
+    assert df["비고"].isna().sum() == 3
+
+
+def test_find_and_delete_before(backend):
+    assert list(backend.find("Sheet1", 이름="삼각대")["ID"]) == ["b"]
+    assert backend.find("Sheet1", 없는열="x").empty
+    backend.write("Logs", pd.DataFrame({"시간": ["2024-01-01 09:00:00", "2024-02-01 09:00:00", ""]}))
+    assert backend.delete_before("Logs", "시간", "2024-02-01") == 1
+    assert list(backend.read("Logs")["시간"]) == ["2024-02-01 09:00:00", ""]
+
+
+def test_iter_rows_resumes_from_cursor(backend):
+    chunks = list(backend.iter_rows("Sheet1", chunk_size=2))
+    assert [len(c) for c, _ in chunks] == [2, 1]
+    backend.append("Sheet1", pd.DataFrame({"ID": ["d"]}))
+    rest = list(backend.iter_rows("Sheet1", cursor=chunks[-1][1]))
+    assert [list(c["ID"]) for c, _ in rest] == [["d"]]
+
+
+def test_migrate_skips_non_empty_destination(backend, tmp_path):
+    dst = SQLiteBackend(str(tmp_path / "dst.db"))
+    dst.write("Users", pd.DataFrame({"username": ["old"]}))
+    backend.write("Users", pd.DataFrame({"username": ["new"]}))
+    assert migrate(backend, dst, ("Sheet1", "Users", "Logs")) == {"Sheet1": 3}
+    assert list(dst.read("Users")["username"]) == ["old"]
+    assert migrate(backend, dst, ("Users",), overwrite=True) == {"Users": 1}
+    assert list(dst.read("Users")["username"]) == ["new"]
+
+
+def test_apply_delta_updates_deletes_and_inserts(backend):
+    version = backend.version("Sheet1")
+    delta = Delta(
+        inserted=pd.DataFrame({"ID": ["d"], "이름": ["마이크"], "대여여부": ["재고"]}),
+        updated={"a": {"대여여부": "대여 중"}},
+        deleted=["c"],
+        base=rows(backend, "a", "c"),
+    )
+    assert backend.apply_delta("Sheet1", delta, "ID") != version
+    df = backend.read("Sheet1")
+    assert sorted(df["ID"]) == ["a", "b", "d"]
+    assert df.loc[df["ID"] == "a", "대여여부"].item() == "대여 중"
+
+
+def test_changed_base_conflicts_and_rolls_back(backend):
+    base = rows(backend, "a", "b")
+    backend.apply_delta("Sheet1", Delta(updated={"b": {"대여여부": "수리 중"}}, base=rows(backend, "b")), "ID")
+    version = backend.version("Sheet1")
+    delta = Delta(updated={"a": {"대여여부": "대여 중"}, "b": {"대여여부": "대여 중"}}, base=base)
+    with pytest.raises(ConflictError) as e:
+        backend.apply_delta("Sheet1", delta, "ID")
+    assert e.value.ids == ["b"]
+    assert backend.version("Sheet1") == version
+    assert rows(backend, "a")["대여여부"].item() == "재고"
+
+
+def test_missing_row_conflicts(backend):
+    delta = Delta(deleted=["zzz"], base=pd.DataFrame({"ID": ["zzz"], "이름": ["없음"], "대여여부": ["재고"]}))
+    with pytest.raises(ConflictError) as e:
+        backend.apply_delta("Sheet1", delta, "ID")
+    assert e.value.ids == ["zzz"]
+
+
+def test_duplicate_insert_conflicts(backend):
+    delta = Delta(inserted=pd.DataFrame({"ID": ["a"], "이름": ["중복"], "대여여부": ["재고"]}))
+    with pytest.raises(ConflictError) as e:
+        backend.apply_delta("Sheet1", delta, "ID")
+    assert e.value.ids == ["a"]
+    assert len(backend.read("Sheet1")) == 3